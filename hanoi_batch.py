@@ -0,0 +1,220 @@
+import json
+import os
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from hanoi_game import TowerOfHanoi, encode_state
+from hanoi_search import EnhancedHanoiSearch
+from hanoi_heuristics import HEURISTICS, PATTERN_TABLES, available_heuristics
+from hanoi_cache import SolutionCache
+from hanoi_moves import MoveSequence, MoveWriter, save_moves
+from hanoi_solver import frame_stewart_moves, optimal_moves
+
+# Closed-form solvers whose moves can go straight to a packed file (optimal on three pegs only)
+STREAMED = {"optimal", "frame_stewart"}
+
+_worker_config = None
+_worker_cache = None
+_worker_memory = []
+
+def parse_state(line):
+    """Parse one start state into (id, towers).
+
+    A line is either JSON, a list of towers or {"id": ..., "towers": [...]}, or plain
+    text with towers separated by '|' and disks listed bottom first, e.g. "3 2 | 1 |".
+    """
+    ident = None
+    if line.startswith(("[", "{")):
+        data = json.loads(line)
+        if isinstance(data, dict):
+            ident, data = data.get("id"), data["towers"]
+        towers = [[int(disk) for disk in tower] for tower in data]
+    else:
+        towers = [[int(disk) for disk in tower.replace(",", " ").split()] for tower in line.split("|")]
+    disks = sorted(disk for tower in towers for disk in tower)
+    if (len(towers) < 3 or disks != list(range(1, len(disks) + 1))
+            or any(tower != sorted(tower, reverse=True) for tower in towers)):
+        raise ValueError(f"not a legal Tower of Hanoi state: {line}")
+    return ident, towers
+
+def format_state(towers):
+    """Write towers in the plain text form parse_state() reads"""
+    return " | ".join(" ".join(map(str, tower)) for tower in towers)
+
+def solve(towers, algorithm, heuristic=None, cache=None):
+    game = TowerOfHanoi(sum(len(tower) for tower in towers), len(towers))
+    game.set_state(towers)
+    search = EnhancedHanoiSearch(game, cache=cache)
+    if heuristic is not None:
+        search.heuristic = HEURISTICS[heuristic](game.num_disks, game.num_pegs)
+    moves = search.run(algorithm)
+    return moves, search.search_stats
+
+def stream(towers, algorithm, path):
+    """Write a closed-form solution move by move to a packed file, never holding it as a list.
+
+    Returns the stats a search would have reported for it.
+    """
+    num_disks, num_pegs = sum(len(tower) for tower in towers), len(towers)
+    code = encode_state(towers)
+    start_time = time.perf_counter()
+    moves = optimal_moves(code, num_disks) if algorithm == "optimal" else \
+        frame_stewart_moves(code, num_disks, num_pegs)
+    with MoveWriter(path, code, num_disks, num_pegs) as writer:
+        writer.write_all(moves)
+    return {"nodes_explored": 0, "states_visited": 0, "max_queue_size": 0, "success": True,
+            "search_time": time.perf_counter() - start_time, "path_length": writer.count}
+
+def solve_line(number, line, algorithm, heuristic=None, include_moves=True, animation_dir=None,
+               animation_format="gif", moves_dir=None, cache=None):
+    """Solve one input line into a JSON-ready result, an error record for an illegal state.
+
+    Closed-form solutions bound only for moves_dir are streamed to their file; the
+    animation, if any, is then rendered from that file.
+    """
+    try:
+        ident, towers = parse_state(line)
+        ident = number if ident is None else ident
+        moves_file = moves_dir and os.path.join(moves_dir, f"solution_{ident}.hmv")
+        streamed = (moves_file and not include_moves and algorithm in STREAMED
+                    and (algorithm == "frame_stewart" or len(towers) == 3))
+        if streamed:
+            stats = stream(towers, algorithm, moves_file)
+        else:
+            moves, stats = solve(towers, algorithm, heuristic, cache)
+    except ValueError as e:
+        return {"id": number, "error": str(e)}
+    result = {"id": ident, "disks": sum(len(tower) for tower in towers), "pegs": len(towers), "stats": stats}
+    if include_moves:
+        result["moves"] = moves
+    if streamed:
+        result["moves_file"] = moves_file
+    elif moves_dir:
+        result["moves_file"] = save_moves(moves_file, moves, encode_state(towers), result["disks"], result["pegs"])
+    if animation_dir and stats["path_length"]:
+        # Pillow and imageio are only needed when rendering, so they are imported on first use
+        from hanoi_render import save_solution_animation
+        animation = os.path.join(animation_dir, f"solution_{result['id']}.{animation_format}")
+        if streamed:
+            with MoveSequence(moves_file) as sequence:
+                result["animation"] = save_solution_animation(towers, sequence, animation)
+        else:
+            result["animation"] = save_solution_animation(towers, moves, animation)
+    return result
+
+def numbered_lines(lines):
+    """Yield (line number, text) for the non-blank, non-comment input lines"""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield number, line
+
+def _init_worker(config, shared, cache_size, cache_path):
+    global _worker_config, _worker_cache
+    _worker_config = config
+    if cache_size or cache_path:
+        _worker_cache = SolutionCache(cache_size, cache_path)
+    for key, name, length in shared:
+        memory = SharedMemory(name)
+        _worker_memory.append(memory)
+        PATTERN_TABLES[key] = memory.buf[:length].cast("H")
+
+def _solve_task(task):
+    return os.getpid(), solve_line(*task, cache=_worker_cache, **_worker_config)
+
+class BatchSolver:
+    """Solve batches of start states across a process pool.
+
+    Read-only tables the heuristic needs are built once in the parent and handed to
+    the workers in shared memory; report aggregates per-worker throughput. With a
+    cache_size or cache_path every process keeps its own SolutionCache, sharing the
+    SQLite file if there is one.
+    """
+    def __init__(self, algorithm, heuristic=None, workers=None, include_moves=True, animation_dir=None,
+                 animation_format="gif", cache_size=0, cache_path=None, moves_dir=None):
+        self.config = {"algorithm": algorithm, "heuristic": heuristic, "include_moves": include_moves,
+                       "animation_dir": animation_dir, "animation_format": animation_format,
+                       "moves_dir": moves_dir}
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self.cache = SolutionCache(cache_size, cache_path) if cache_size or cache_path else None
+        self.workers = workers or os.cpu_count()
+        self.report = {}
+    
+    def _prepare(self, tasks):
+        """Build the heuristic and lookup tables for every instance size in the batch before forking"""
+        lookup = self.config["algorithm"] == "lookup"
+        if self.config["heuristic"] is None and not lookup:
+            return
+        sizes = set()
+        for _, line in tasks:
+            try:
+                _, towers = parse_state(line)
+            except ValueError:
+                continue
+            sizes.add((sum(len(tower) for tower in towers), len(towers)))
+        # Sizes a heuristic or table does not cover are skipped here and left to solve_line,
+        # which reports the ValueError for each such instance
+        heuristic = self.config["heuristic"]
+        for num_disks, num_pegs in sizes:
+            if heuristic is not None and heuristic in available_heuristics(num_pegs):
+                HEURISTICS[heuristic](num_disks, num_pegs)
+            if lookup and num_pegs == 3:
+                from hanoi_tables import MAX_DISKS, open_table
+                if num_disks <= MAX_DISKS:
+                    # Saved to disk here; each worker memory-maps the same file instead of rebuilding it
+                    open_table(num_disks)
+    
+    def _share(self):
+        blocks, shared = [], []
+        for key, table in PATTERN_TABLES.items():
+            data = memoryview(table).cast("B")
+            memory = SharedMemory(create=True, size=max(1, data.nbytes))
+            memory.buf[:data.nbytes] = data
+            blocks.append(memory)
+            shared.append((key, memory.name, data.nbytes))
+        return blocks, shared
+    
+    def _record(self, pid, result):
+        self.report["instances"] += 1
+        stats = result.get("stats")
+        worker = self.report["workers"].setdefault(pid, {"instances": 0, "errors": 0, "cached": 0,
+                                                          "nodes_explored": 0, "search_time": 0.0})
+        worker["instances"] += 1
+        if stats is None:
+            worker["errors"] += 1
+            return
+        worker["cached"] += stats.get("cached", False)
+        worker["nodes_explored"] += stats["nodes_explored"]
+        worker["search_time"] += stats["search_time"]
+        worker["nodes_per_sec"] = worker["nodes_explored"] / worker["search_time"] if worker["search_time"] else 0.0
+    
+    def solve(self, lines, ordered=True):
+        """Yield one result per start state, in input order or as the workers finish them"""
+        tasks = list(numbered_lines(lines))
+        self.report = {"instances": 0, "workers": {}, "wall_time": 0.0}
+        start_time = time.time()
+        self._prepare(tasks)
+        if self.workers == 1:
+            pid = os.getpid()
+            for task in tasks:
+                result = solve_line(*task, cache=self.cache, **self.config)
+                self._record(pid, result)
+                yield result
+        else:
+            blocks, shared = self._share()
+            try:
+                with Pool(self.workers, _init_worker, (self.config, shared, self.cache_size, self.cache_path)) as pool:
+                    chunksize = max(1, len(tasks) // (self.workers * 8))
+                    results = pool.imap(_solve_task, tasks, chunksize) if ordered else \
+                        pool.imap_unordered(_solve_task, tasks, chunksize)
+                    for pid, result in results:
+                        self._record(pid, result)
+                        yield result
+            finally:
+                for memory in blocks:
+                    memory.close()
+                    memory.unlink()
+        self.report["wall_time"] = time.time() - start_time
+        self.report["instances_per_sec"] = self.report["instances"] / self.report["wall_time"] \
+            if self.report["wall_time"] else 0.0
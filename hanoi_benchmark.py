@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from hanoi_game import TowerOfHanoi
+from hanoi_search import EnhancedHanoiSearch
+from hanoi_heuristics import HEURISTICS
+from hanoi_solver import optimal_solution
+
+SEARCHES = ["bfs", "layered_bfs", "external_bfs", "dfs", "bidirectional", "parallel_bidirectional", "astar",
+            "ida_star", "optimal", "lookup", "frame_stewart"]
+RENDERS = ["frames", "animation"]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time search algorithms and rendering over seeded random starts")
+    parser.add_argument("--cases", nargs="+", choices=SEARCHES + RENDERS, default=SEARCHES + RENDERS)
+    parser.add_argument("--disks", nargs="+", type=int, default=[4, 6, 8])
+    parser.add_argument("--pegs", type=int, default=3)
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1, 2])
+    parser.add_argument("--heuristic", choices=list(HEURISTICS), default="Pattern database",
+                        help="heuristic for astar and ida_star")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per instance; the fastest is kept")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON results to FILE instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="print the change against an earlier results file")
+    return parser.parse_args(argv)
+
+def start_state(num_disks, num_pegs, seed):
+    game = TowerOfHanoi(num_disks, num_pegs)
+    game.randomize(random.Random(seed))
+    return game
+
+def search_case(algorithm, heuristic):
+    """Return a function running one search on a game and returning its stats"""
+    def run(game):
+        search = EnhancedHanoiSearch(game)
+        if algorithm in ("astar", "ida_star"):
+            search.heuristic = HEURISTICS[heuristic](game.num_disks, game.num_pegs)
+        getattr(search, algorithm)()
+        return search.search_stats
+    return run
+
+def render_case(kind):
+    """Return a function rendering the optimal solution of a game frame by frame or to a GIF"""
+    from hanoi_render import FrameRenderer, save_solution_animation
+
+    def run(game):
+        moves = optimal_solution(game.get_encoded_state(), game.num_disks) if game.num_pegs == 3 else \
+            EnhancedHanoiSearch(game).frame_stewart()
+        if kind == "frames":
+            renderer = FrameRenderer(game.num_disks, game.num_pegs)
+            renderer.start(game.get_state())
+            for from_tower, to_tower in moves:
+                renderer.move(from_tower, to_tower)
+        else:
+            with tempfile.TemporaryDirectory() as directory:
+                save_solution_animation(game.get_state(), moves, os.path.join(directory, "solution.gif"))
+        return {"frames": len(moves) + 1}
+    return run
+
+def measure(run, game, repeat):
+    """Time the fastest of repeat runs, then trace one more for peak memory and retained allocations"""
+    best, stats = None, None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        stats = run(game)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    blocks = len(tracemalloc.take_snapshot().traces)
+    run(game)
+    peak = tracemalloc.get_traced_memory()[1]
+    retained = len(tracemalloc.take_snapshot().traces) - blocks
+    tracemalloc.stop()
+    result = {"wall_time": best, "peak_bytes": peak, "retained_blocks": retained}
+    if "nodes_explored" in stats:
+        result.update(nodes_explored=stats["nodes_explored"], states_visited=stats["states_visited"],
+                      path_length=stats["path_length"],
+                      nodes_per_sec=stats["nodes_explored"] / best if best else 0.0)
+    else:
+        result.update(stats, frames_per_sec=stats["frames"] / best if best else 0.0)
+    return result
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds")}
+
+def run_benchmarks(args):
+    results = []
+    for case in args.cases:
+        run = render_case(case) if case in RENDERS else search_case(case, args.heuristic)
+        for num_disks in args.disks:
+            for seed in args.seeds:
+                game = start_state(num_disks, args.pegs, seed)
+                result = {"case": case, "disks": num_disks, "pegs": args.pegs, "seed": seed}
+                try:
+                    result.update(measure(run, game, args.repeat))
+                except ValueError as e:
+                    # An instance the case does not cover, such as a heuristic or table limited in size
+                    # or peg count, is kept in the results with the reason
+                    result["skipped"] = str(e)
+                results.append(result)
+                outcome = f"skipped: {result['skipped']}" if "skipped" in result else f"{result['wall_time']:.4f}s"
+                print(f"{case:>22} disks={num_disks:<3} seed={seed:<3} {outcome}", file=sys.stderr)
+    return {"environment": environment(), "settings": vars(args), "results": results}
+
+def compare(results, baseline):
+    """Print the wall time and peak memory ratio of each case against a baseline run"""
+    key = lambda result: (result["case"], result["disks"], result["pegs"], result["seed"])
+    earlier = {key(result): result for result in baseline["results"]}
+    print(f"against {baseline['environment']['commit']}: wall time and peak memory, new / old")
+    for result in results["results"]:
+        old = earlier.get(key(result))
+        if old is None or "skipped" in old or "skipped" in result:
+            continue
+        time_ratio = result["wall_time"] / old["wall_time"] if old["wall_time"] else float("inf")
+        memory_ratio = result["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("inf")
+        print(f"{result['case']:>22} disks={result['disks']:<3} seed={result['seed']:<3} "
+              f"time x{time_ratio:.2f}  memory x{memory_ratio:.2f}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args)
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(results, out, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(results, json.load(baseline))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import queue
+import threading
+
+class Cancelled(Exception):
+    pass
+
+class CancelToken:
+    """Cooperative cancellation flag shared by the Tk thread and one worker"""
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise Cancelled in the worker once the token has been cancelled"""
+        if self._event.is_set():
+            raise Cancelled()
+
+class MessageChannel:
+    """Carry handler calls from worker threads to the Tk thread through a bounded queue.
+
+    Workers post(token, handler, *args); the Tk side calls drain() from one periodic
+    after() callback, which runs the handlers in posting order and skips those whose
+    token was cancelled in the meantime. A latest=True post, such as a progress update,
+    replaces the previous one for the same token and handler instead of queueing, so a fast worker
+    cannot flood the loop. Other posts wait for room while the queue is full.
+    """
+    def __init__(self, maxsize=256):
+        self._queue = queue.Queue(maxsize)
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def post(self, token, handler, *args, latest=False):
+        if latest:
+            with self._lock:
+                self._latest[token, handler] = args
+            return
+        while token is None or not token.cancelled:
+            try:
+                self._queue.put((token, handler, args), timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def drain(self, limit=64):
+        """Run the pending handlers on the calling (Tk) thread, at most limit queued ones per call"""
+        with self._lock:
+            latest, self._latest = self._latest, {}
+        # Workers post their final messages after their last progress update, so coalesced updates go first
+        for (token, handler), args in latest.items():
+            if token is None or not token.cancelled:
+                handler(*args)
+        for _ in range(limit):
+            try:
+                token, handler, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if token is None or not token.cancelled:
+                handler(*args)
@@ -0,0 +1,144 @@
+import sqlite3
+from collections import OrderedDict
+from hanoi_game import canonical_labels, peg_bits, top_disks
+
+# Searches whose paths are shortest, so the rest of a path from any state along it is
+# shortest too; optimal and lookup are closed forms, cheaper to rerun than to index
+SUFFIX_INDEXED = {"bfs", "layered_bfs", "external_bfs", "parallel_bidirectional", "astar", "ida_star"}
+
+def apply_move(code, from_tower, to_tower, num_disks, num_pegs=3):
+    disk = top_disks(code, num_disks, num_pegs)[from_tower]
+    return code ^ ((from_tower ^ to_tower) << (peg_bits(num_pegs) * (disk - 1)))
+
+def pack_moves(moves):
+    return bytes(from_tower << 4 | to_tower for from_tower, to_tower in moves)
+
+def unpack_moves(data):
+    return [(move >> 4, move & 15) for move in data]
+
+class SolutionCache:
+    """Solutions keyed by (num_disks, num_pegs, algorithm, canonical state) with LRU eviction.
+
+    Moves are stored in the canonical peg labelling of their start state, so one entry
+    answers every relabelling of the intermediate pegs. For shortest-path searches the
+    remainder of a cached path is itself shortest, so the states along it are indexed
+    too, on the first miss after the entry is added. capacity bounds the states the
+    cache answers for, entries and indexed states together. An optional SQLite file
+    keeps whole solutions across runs and processes.
+    """
+    def __init__(self, capacity=4096, path=None):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        # suffix state key -> (entry key, offset into its moves, relabelling into the suffix state's labels)
+        self.suffixes = {}
+        self.indexed = {}
+        self.pending = OrderedDict()
+        self._labellings = {}
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30)
+            # WAL lets worker processes read while one writes, and skips an fsync per commit
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, moves BLOB)")
+            self.db.commit()
+
+    def __len__(self):
+        return len(self.entries) + len(self.suffixes)
+
+    def get(self, code, num_disks, num_pegs, algorithm):
+        """Return the cached moves from a packed state in its own peg numbering, or None"""
+        canonical, labels = canonical_labels(code, num_disks, num_pegs)
+        key = (num_disks, num_pegs, algorithm, canonical)
+        moves = self.entries.get(key)
+        if moves is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self._unlabel(moves, labels)
+        if key not in self.suffixes:
+            self._index_pending()
+        suffix = self.suffixes.get(key)
+        if suffix is not None:
+            entry_key, offset, relabel = suffix
+            self.entries.move_to_end(entry_key)
+            moves = [(relabel[from_tower], relabel[to_tower])
+                     for from_tower, to_tower in self.entries[entry_key][offset:]]
+            self.hits += 1
+            return self._unlabel(moves, labels)
+        moves = self._load(key)
+        if moves is None:
+            self.misses += 1
+            return None
+        self._insert(key, moves)
+        self.hits += 1
+        return self._unlabel(moves, labels)
+
+    def put(self, code, num_disks, num_pegs, algorithm, moves):
+        canonical, labels = canonical_labels(code, num_disks, num_pegs)
+        key = (num_disks, num_pegs, algorithm, canonical)
+        moves = [(labels[from_tower], labels[to_tower]) for from_tower, to_tower in moves]
+        self._insert(key, moves)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?)", (self._db_key(key), pack_moves(moves)))
+            self.db.commit()
+
+    def _unlabel(self, moves, labels):
+        pegs = [0] * len(labels)
+        for peg, label in enumerate(labels):
+            pegs[label] = peg
+        return [(pegs[from_tower], pegs[to_tower]) for from_tower, to_tower in moves]
+
+    def _insert(self, key, moves):
+        if key in self.entries:
+            self._evict(key)
+        self.suffixes.pop(key, None)
+        self.entries[key] = moves
+        if key[2] in SUFFIX_INDEXED:
+            self.pending[key] = None
+        while self.entries and len(self) > self.capacity:
+            self._evict(next(iter(self.entries)))
+
+    def _index_pending(self):
+        """Index the states along the paths added since the last miss, most recent first"""
+        while self.pending:
+            key, _ = self.pending.popitem()
+            self._index(key)
+
+    def _index(self, key):
+        """Map each state along an entry's path to the entry, as far as the capacity leaves room"""
+        num_disks, num_pegs, algorithm, code = key
+        indexed = self.indexed[key] = []
+        for offset, (from_tower, to_tower) in enumerate(self.entries[key][:-1], 1):
+            if len(self) >= self.capacity:
+                break
+            code = apply_move(code, from_tower, to_tower, num_disks, num_pegs)
+            canonical, labels = canonical_labels(code, num_disks, num_pegs)
+            suffix_key = (num_disks, num_pegs, algorithm, canonical)
+            if suffix_key not in self.entries and suffix_key not in self.suffixes:
+                # Relabellings are permutations of a few pegs; one shared tuple serves each
+                labels = tuple(labels)
+                self.suffixes[suffix_key] = (key, offset, self._labellings.setdefault(labels, labels))
+                indexed.append(suffix_key)
+
+    def _evict(self, key):
+        self.entries.pop(key)
+        self.pending.pop(key, None)
+        for suffix_key in self.indexed.pop(key, ()):
+            if self.suffixes.get(suffix_key, (None,))[0] == key:
+                del self.suffixes[suffix_key]
+
+    def _db_key(self, key):
+        return ":".join(str(part) for part in key)
+
+    def _load(self, key):
+        if self.db is None:
+            return None
+        row = self.db.execute("SELECT moves FROM solutions WHERE key = ?", (self._db_key(key),)).fetchone()
+        return None if row is None else unpack_moves(row[0])
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -0,0 +1,66 @@
+import json
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"HNCK"
+VERSION = 1
+NO_PARENT = (1 << 64) - 1
+_HEADER = struct.Struct("<4sHI")
+_COUNT = struct.Struct("<Q")
+
+def _write_codes(handle, codes):
+    values = array("Q", codes)
+    handle.write(_COUNT.pack(len(values)))
+    values.tofile(handle)
+
+def _read_codes(handle, swap):
+    count, = _COUNT.unpack(handle.read(_COUNT.size))
+    values = array("Q")
+    values.fromfile(handle, count)
+    if swap:
+        values.byteswap()
+    return values
+
+def save_checkpoint(path, meta, sections):
+    """Write a checkpoint: a versioned header, JSON metadata, then one bulk array per section.
+
+    Sections map a name to a sequence of packed states (a frontier) or to a dict of
+    packed states (a parent or cost table, None values allowed). The file is written
+    next to path and swapped in, so a crash mid-write leaves the previous checkpoint.
+    """
+    meta = dict(meta, byteorder=sys.byteorder,
+                sections=[[name, "table" if isinstance(data, dict) else "list"] for name, data in sections.items()])
+    header = json.dumps(meta).encode()
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+        handle.write(header)
+        for data in sections.values():
+            if isinstance(data, dict):
+                _write_codes(handle, data.keys())
+                _write_codes(handle, (NO_PARENT if value is None else value for value in data.values()))
+            else:
+                _write_codes(handle, data)
+    os.replace(temp_path, path)
+
+def load_checkpoint(path):
+    """Read a checkpoint back as (meta, sections), frontiers as arrays and tables as dicts"""
+    with open(path, "rb") as handle:
+        magic, version, header_size = _HEADER.unpack(handle.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a search checkpoint")
+        if version != VERSION:
+            raise ValueError(f"unsupported checkpoint version {version}")
+        meta = json.loads(handle.read(header_size))
+        swap = meta["byteorder"] != sys.byteorder
+        sections = {}
+        for name, kind in meta["sections"]:
+            codes = _read_codes(handle, swap)
+            if kind == "table":
+                values = _read_codes(handle, swap)
+                sections[name] = {code: None if value == NO_PARENT else value for code, value in zip(codes, values)}
+            else:
+                sections[name] = codes
+    return meta, sections
@@ -0,0 +1,143 @@
+import argparse
+import cProfile
+import json
+import os
+import random
+import sys
+from hanoi_game import TowerOfHanoi, decode_state
+from hanoi_search import EnhancedHanoiSearch
+from hanoi_heuristics import HEURISTICS, THREE_PEG_ONLY
+from hanoi_batch import STREAMED, BatchSolver, format_state
+from hanoi_moves import MoveWriter, save_moves
+from hanoi_solver import frame_stewart_moves
+
+ALGORITHMS = ["bfs", "layered_bfs", "external_bfs", "dfs", "bidirectional", "parallel_bidirectional", "astar",
+              "ida_star", "optimal", "lookup", "frame_stewart"]
+CHECKPOINTED = ["bfs", "dfs", "bidirectional", "astar"]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Solve Tower of Hanoi instances without the GUI")
+    parser.add_argument("--disks", type=int, default=10)
+    parser.add_argument("--pegs", type=int, default=3)
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="bfs")
+    parser.add_argument("--heuristic", choices=list(HEURISTICS), help="heuristic for astar and ida_star")
+    parser.add_argument("--random", action="store_true", help="start from a random legal state")
+    parser.add_argument("--seed", type=int, help="seed for --random and --generate")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="write N uniformly random start states, one per line for --input, "
+                             "or as packed codes if --output ends in .npy")
+    parser.add_argument("--checkpoint", help="file to checkpoint the search to")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between checkpoints")
+    parser.add_argument("--resume", metavar="CHECKPOINT", help="continue a search from a checkpoint file")
+    parser.add_argument("--frontier-dir", metavar="DIR", help="directory for external_bfs layer files")
+    parser.add_argument("--memory-limit", type=int, metavar="MB", help="memory budget for external_bfs")
+    parser.add_argument("--stats-json", metavar="FILE",
+                        help="write the search stats with a per-depth profile to FILE as JSON")
+    parser.add_argument("--cprofile", metavar="FILE", help="run the search under cProfile and dump it to FILE")
+    parser.add_argument("--input", metavar="FILE",
+                        help="solve every start state in FILE ('-' for stdin) and write one JSON line per state")
+    parser.add_argument("--output", metavar="FILE",
+                        help="write batch results or generated states to FILE instead of stdout")
+    parser.add_argument("--no-moves", action="store_true", help="leave the move lists out of batch results")
+    parser.add_argument("--export", metavar="FILE", help="write the solution to FILE in the packed move format")
+    parser.add_argument("--moves-dir", metavar="DIR",
+                        help="also write each batch solution to DIR in the packed move format")
+    parser.add_argument("--animate", metavar="DIR", help="also render each solution as an animation into DIR")
+    parser.add_argument("--format", choices=["gif", "mp4", "webm"], default="gif", help="animation format")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for a batch, 0 for one per core")
+    parser.add_argument("--cache", type=int, default=0, metavar="N",
+                        help="answer up to N states per process from cached solutions, counting the "
+                             "states along shortest paths")
+    parser.add_argument("--cache-file", metavar="FILE", help="SQLite file that persists cached solutions")
+    parser.add_argument("--unordered", action="store_true", help="write batch results as they complete")
+    return parser.parse_args(argv)
+
+def solve_batch(lines, out, solver, ordered=True):
+    """Solve the start states in lines, writing one JSON result per state as soon as it is solved"""
+    for result in solver.solve(lines, ordered):
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+def generate(out, count, num_disks, num_pegs, seed=None, chunk=1 << 16):
+    """Write count uniformly random start states as text lines, drawn a chunk at a time with NumPy"""
+    import numpy as np
+    from hanoi_vector import random_codes
+    rng = np.random.default_rng(seed)
+    for first in range(0, count, chunk):
+        codes = random_codes(min(chunk, count - first), num_disks, num_pegs, rng)
+        out.writelines(format_state(decode_state(code, num_disks, num_pegs)) + "\n" for code in codes.tolist())
+
+def report(success, path, stats):
+    print(f"Success: {success}")
+    print(f"Time: {stats['search_time']:.3f} seconds")
+    print(f"States explored: {stats['nodes_explored']}")
+    print(f"Unique states: {stats['states_visited']}")
+    print(f"Solution length: {stats['path_length']} moves")
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.input:
+        for directory in (args.animate, args.moves_dir):
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        lines = sys.stdin if args.input == "-" else open(args.input)
+        out = sys.stdout if args.output is None else open(args.output, "w")
+        solver = BatchSolver(args.algorithm, args.heuristic, args.workers, not args.no_moves, args.animate,
+                             args.format, args.cache, args.cache_file, args.moves_dir)
+        with lines, out:
+            solve_batch(lines, out, solver, not args.unordered)
+        print(json.dumps(solver.report), file=sys.stderr)
+        return
+    if args.generate is not None and args.output and args.output.endswith(".npy"):
+        import numpy as np
+        from hanoi_vector import random_codes
+        np.save(args.output, random_codes(args.generate, args.disks, args.pegs, args.seed))
+        return
+    if args.generate is not None:
+        out = sys.stdout if args.output is None else open(args.output, "w")
+        with out:
+            generate(out, args.generate, args.disks, args.pegs, args.seed)
+        return
+    if args.resume:
+        try:
+            search = EnhancedHanoiSearch.from_checkpoint(args.resume, on_search_complete=report,
+                                                         heuristic=args.heuristic, checkpoint_path=args.checkpoint,
+                                                         checkpoint_interval=args.interval)
+        except ValueError as e:
+            sys.exit(str(e))
+        search.continue_search()
+        return
+    if args.checkpoint and args.algorithm not in CHECKPOINTED:
+        sys.exit(f"--checkpoint only applies to {', '.join(CHECKPOINTED)}")
+    if args.algorithm in THREE_PEG_ONLY and args.pegs != 3:
+        sys.exit(f"{args.algorithm} solves three pegs only; frame_stewart handles more")
+    game = TowerOfHanoi(args.disks, args.pegs)
+    if args.random:
+        game.randomize(random.Random(args.seed))
+    if args.export and args.algorithm in STREAMED:
+        # Closed-form solutions go straight from the generator to the file, never held as a list
+        code = game.get_encoded_state()
+        with MoveWriter(args.export, code, args.disks, args.pegs) as writer:
+            writer.write_all(frame_stewart_moves(code, args.disks, args.pegs))
+        print(f"Wrote {writer.count} moves to {args.export}")
+        return
+    search = EnhancedHanoiSearch(game, on_search_complete=report, checkpoint_path=args.checkpoint,
+                                 checkpoint_interval=args.interval, frontier_dir=args.frontier_dir,
+                                 memory_limit=args.memory_limit and args.memory_limit * 2**20,
+                                 instrument=bool(args.stats_json), profiler=args.cprofile and cProfile.Profile())
+    if args.heuristic is not None:
+        search.use_heuristic(args.heuristic)
+    try:
+        path = getattr(search, args.algorithm)()
+    except ValueError as e:
+        sys.exit(str(e))
+    if args.export and path is not None:
+        save_moves(args.export, path, game.get_encoded_state(), args.disks, args.pegs)
+    if args.stats_json:
+        with open(args.stats_json, "w") as out:
+            json.dump(search.search_stats, out, indent=2)
+    if args.cprofile:
+        search.profiler.dump_stats(args.cprofile)
+
+if __name__ == "__main__":
+    main()
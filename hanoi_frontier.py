@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from hanoi_vector import expand_codes, canonical_codes
+
+DEFAULT_MEMORY_LIMIT = 64 * 2**20
+CODE = np.dtype("<u8")
+
+class LayerFile:
+    """A BFS layer on disk: sorted states and, aligned with them, the state each was reached from"""
+    def __init__(self, directory, depth):
+        self.states_path = os.path.join(directory, f"layer_{depth}.states")
+        self.parents_path = os.path.join(directory, f"layer_{depth}.parents")
+        self._states = self._parents = None
+    
+    def __len__(self):
+        return os.path.getsize(self.states_path) // CODE.itemsize
+    
+    def _map(self, path):
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=CODE)
+        return np.memmap(path, dtype=CODE, mode="r")
+    
+    @property
+    def states(self):
+        if self._states is None:
+            self._states = self._map(self.states_path)
+        return self._states
+    
+    @property
+    def parents(self):
+        if self._parents is None:
+            self._parents = self._map(self.parents_path)
+        return self._parents
+    
+    def contains(self, codes):
+        """Return a mask of which of the sorted codes are in the layer, by binary search on the mapped file"""
+        states = self.states
+        if not len(states):
+            return np.zeros(len(codes), dtype=bool)
+        found = np.minimum(np.searchsorted(states, codes), len(states) - 1)
+        return states[found] == codes
+    
+    def parent(self, code):
+        return int(self.parents[np.searchsorted(self.states, code)])
+    
+    def chunks(self, size):
+        for start in range(0, len(self), size):
+            yield np.array(self.states[start:start + size])
+    
+    def close(self):
+        self._states = self._parents = None
+
+class ExternalFrontier:
+    """Breadth-first layers kept in sorted binary files under a memory budget.
+
+    A layer is expanded a chunk at a time into sorted runs on disk; the runs are then
+    merged a block at a time, duplicates dropped, and anything already in the current
+    or previous layer filtered out by binary search in those files, the only two
+    hanoi_vector.next_layer() has to check as well. Peak memory stays near
+    memory_limit however large the layers grow.
+    """
+    def __init__(self, num_disks, num_pegs=3, symmetry=False, directory=None, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.num_disks = num_disks
+        self.num_pegs = num_pegs
+        self.symmetry = symmetry
+        self._owns_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix="hanoi_frontier_") if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+        # Expanding a state yields at most num_pegs * (num_pegs - 1) / 2 successors, each
+        # held with its parent and sort scratch space; budget for that per chunk state
+        self.chunk_size = max(1024, memory_limit // (4 * CODE.itemsize * num_pegs * num_pegs))
+        self.layers = []
+    
+    def start(self, code):
+        layer = LayerFile(self.directory, 0)
+        np.array([code], dtype=CODE).tofile(layer.states_path)
+        np.array([code], dtype=CODE).tofile(layer.parents_path)
+        self.layers = [layer]
+        return layer
+    
+    def _write_runs(self, layer):
+        runs = []
+        for number, states in enumerate(layer.chunks(self.chunk_size)):
+            parents, successors = expand_codes(states, self.num_disks, self.num_pegs)
+            if self.symmetry:
+                successors = canonical_codes(successors, self.num_disks, self.num_pegs)
+            successors, first = np.unique(successors, return_index=True)
+            run = os.path.join(self.directory, f"run_{number}")
+            successors.tofile(run + ".states")
+            states[parents[first]].tofile(run + ".parents")
+            runs.append(run)
+        return runs
+    
+    def _merge_runs(self, runs, seen, out):
+        """Merge sorted runs block by block, writing each state once if it is not in a seen layer"""
+        block = max(1, self.chunk_size // (len(runs) + 1))
+        maps = [(np.memmap(run + ".states", dtype=CODE, mode="r"), np.memmap(run + ".parents", dtype=CODE, mode="r"))
+                for run in runs if os.path.getsize(run + ".states")]
+        cursors = [0] * len(maps)
+        states_out, parents_out = out
+        while True:
+            live = [i for i, (states, _) in enumerate(maps) if cursors[i] < len(states)]
+            if not live:
+                break
+            # Everything up to the smallest last element of the loaded blocks is final
+            bound = min(maps[i][0][min(cursors[i] + block, len(maps[i][0])) - 1] for i in live)
+            states_parts, parents_parts = [], []
+            for i in live:
+                states, parents = maps[i]
+                end = cursors[i] + int(np.searchsorted(states[cursors[i]:cursors[i] + block], bound, "right"))
+                states_parts.append(np.array(states[cursors[i]:end]))
+                parents_parts.append(np.array(parents[cursors[i]:end]))
+                cursors[i] = end
+            states, first = np.unique(np.concatenate(states_parts), return_index=True)
+            parents = np.concatenate(parents_parts)[first]
+            fresh = np.ones(len(states), dtype=bool)
+            for layer in seen:
+                fresh &= ~layer.contains(states)
+            states[fresh].tofile(states_out)
+            parents[fresh].tofile(parents_out)
+        del maps
+    
+    def expand(self):
+        """Write the next layer from the last one and return it"""
+        layer = self.layers[-1]
+        runs = self._write_runs(layer)
+        seen = self.layers[-2:]
+        next_layer = LayerFile(self.directory, len(self.layers))
+        with open(next_layer.states_path, "wb") as states_out, open(next_layer.parents_path, "wb") as parents_out:
+            self._merge_runs(runs, seen, (states_out, parents_out))
+        for run in runs:
+            os.remove(run + ".states")
+            os.remove(run + ".parents")
+        # Only the parents of older layers are needed from here on, for path recovery
+        if len(self.layers) > 1:
+            self.layers[-2].close()
+        self.layers.append(next_layer)
+        return next_layer
+    
+    def chain(self, code):
+        """Return the states from the start to code, which must be in the last layer"""
+        states = [code]
+        for layer in reversed(self.layers[1:]):
+            code = layer.parent(code)
+            states.append(code)
+        states.reverse()
+        return states
+    
+    def close(self):
+        """Drop the layer files, and the directory too if it was a temporary one"""
+        for layer in self.layers:
+            layer.close()
+            os.remove(layer.states_path)
+            os.remove(layer.parents_path)
+        self.layers = []
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -1,29 +1,155 @@
 import random
 
+PEG_BITS = 2
+PEG_MASK = (1 << PEG_BITS) - 1
+_move_orders = {}
+
+def peg_bits(num_pegs):
+    """Bits per disk in a packed state: 2 for up to four pegs, more beyond that"""
+    return max(PEG_BITS, (num_pegs - 1).bit_length())
+
+def move_order(num_pegs):
+    order = _move_orders.get(num_pegs)
+    if order is None:
+        order = _move_orders[num_pegs] = [(from_tower, to_tower) for from_tower in range(num_pegs)
+                                          for to_tower in range(num_pegs) if from_tower != to_tower]
+    return order
+
+MOVE_ORDER = move_order(3)
+
+def encode_state(state):
+    """Pack a tuple-of-towers state into an int holding each disk's peg in peg_bits() bits"""
+    bits = peg_bits(len(state))
+    code = 0
+    for peg, tower in enumerate(state):
+        for disk in tower:
+            code |= peg << (bits * (disk - 1))
+    return code
+
+def decode_state(code, num_disks, num_pegs=3):
+    bits = peg_bits(num_pegs)
+    mask = (1 << bits) - 1
+    towers = [[] for _ in range(num_pegs)]
+    for disk in range(num_disks, 0, -1):
+        towers[(code >> (bits * (disk - 1))) & mask].append(disk)
+    return tuple(tuple(tower) for tower in towers)
+
+def goal_code(num_disks, num_pegs=3, goal_peg=None):
+    if goal_peg is None:
+        goal_peg = num_pegs - 1
+    bits = peg_bits(num_pegs)
+    code = 0
+    for disk in range(num_disks):
+        code |= goal_peg << (bits * disk)
+    return code
+
+def random_code(num_disks, num_pegs=3, rng=random):
+    """Draw a packed state uniformly from all num_pegs^num_disks legal states.
+
+    Every assignment of disks to pegs is legal once each peg is stacked largest first,
+    so the base-num_pegs digits of one uniform number give each disk its peg.
+    """
+    index = rng.randrange(num_pegs ** num_disks)
+    bits = peg_bits(num_pegs)
+    code = 0
+    for disk in range(num_disks):
+        index, peg = divmod(index, num_pegs)
+        code |= peg << (bits * disk)
+    return code
+
+def top_disks(code, num_disks, num_pegs=3):
+    """Return the smallest disk on each peg of a packed state, 0 for an empty peg"""
+    bits = peg_bits(num_pegs)
+    mask = (1 << bits) - 1
+    tops = [0] * num_pegs
+    found = 0
+    for disk in range(1, num_disks + 1):
+        peg = code & mask
+        if not tops[peg]:
+            tops[peg] = disk
+            found += 1
+            if found == num_pegs:
+                break
+        code >>= bits
+    return tops
+
+def packed_moves(code, num_disks, num_pegs=3):
+    """Return (from_tower, to_tower, new_code) for every legal move of a packed state"""
+    bits = peg_bits(num_pegs)
+    tops = top_disks(code, num_disks, num_pegs)
+    moves = []
+    for from_tower, to_tower in move_order(num_pegs):
+        disk = tops[from_tower]
+        if disk and (not tops[to_tower] or disk < tops[to_tower]):
+            moves.append((from_tower, to_tower, code ^ ((from_tower ^ to_tower) << (bits * (disk - 1)))))
+    return moves
+
+def move_between(code, new_code, num_pegs=3):
+    """Recover the (from_tower, to_tower) move that turns one packed state into an adjacent one"""
+    bits = peg_bits(num_pegs)
+    mask = (1 << bits) - 1
+    shift = ((code ^ new_code).bit_length() - 1) // bits * bits
+    return ((code >> shift) & mask, (new_code >> shift) & mask)
+
+def peg_masks(towers):
+    """Hold each peg as a bitmask of its disks, disk d at bit d - 1, so its top disk is the lowest set bit"""
+    return [sum(1 << (disk - 1) for disk in tower) for tower in towers]
+
+def move_top_disk(pegs, from_tower, to_tower):
+    """Move the top disk between two pegs of peg_masks() in place; return its bit, or 0 if the move is illegal"""
+    source, target = pegs[from_tower], pegs[to_tower]
+    disk = source & -source
+    if not disk or target and target & -target < disk:
+        return 0
+    pegs[from_tower], pegs[to_tower] = source ^ disk, target | disk
+    return disk
+
+def canonical_labels(code, num_disks, num_pegs=3):
+    """Relabel the non-goal pegs in order of their largest disk; return the new code and each peg's label.
+
+    The distance to the goal is unchanged by permuting the intermediate pegs, so
+    every member of such a symmetry class maps to the same canonical code. Pegs
+    without disks take the remaining labels in peg order, so the labels always form
+    a full permutation that moves can be mapped through.
+    """
+    bits = peg_bits(num_pegs)
+    mask = (1 << bits) - 1
+    goal_peg = num_pegs - 1
+    labels = [-1] * num_pegs
+    labels[goal_peg] = goal_peg
+    next_label = 0
+    result = 0
+    for disk in range(num_disks, 0, -1):
+        shift = bits * (disk - 1)
+        peg = (code >> shift) & mask
+        label = labels[peg]
+        if label < 0:
+            label = labels[peg] = next_label
+            next_label += 1
+        result |= label << shift
+    for peg in range(num_pegs):
+        if labels[peg] < 0:
+            labels[peg] = next_label
+            next_label += 1
+    return result, labels
+
+def canonical_code(code, num_disks, num_pegs=3):
+    """The code of a state with its non-goal pegs relabelled, as canonical_labels() gives it"""
+    return canonical_labels(code, num_disks, num_pegs)[0]
+
 class TowerOfHanoi:
-    def __init__(self, num_disks=3):
+    def __init__(self, num_disks=3, num_pegs=3):
         self.num_disks = num_disks
+        self.num_pegs = num_pegs
         self.reset()
     
     def reset(self):
-        self.towers = [[], [], []]
+        self.towers = [[] for _ in range(self.num_pegs)]
         self.towers[0] = list(range(self.num_disks, 0, -1))
         
-    def randomize(self):
-        self.towers = [[], [], []]
-        disks = list(range(self.num_disks, 0, -1))
-        available_towers = [0, 1, 2]
-        empty_tower = random.choice(available_towers)
-        available_towers.remove(empty_tower)
-        
-        for disk in disks:
-            tower = random.choice(available_towers)
-            if not self.towers[tower] or self.towers[tower][-1] > disk:
-                self.towers[tower].append(disk)
-            else:
-                other_tower = available_towers[0] if tower == available_towers[1] else available_towers[1]
-                if not self.towers[other_tower] or self.towers[other_tower][-1] > disk:
-                    self.towers[other_tower].append(disk)
+    def randomize(self, rng=random):
+        """Move to a state drawn uniformly from all legal states; pass a random.Random(seed) to reproduce it"""
+        self.set_encoded_state(random_code(self.num_disks, self.num_pegs, rng))
     
     def is_valid_move(self, from_tower, to_tower):
         if not self.towers[from_tower]:
@@ -40,25 +166,31 @@ class TowerOfHanoi:
         return False
     
     def is_goal_state(self):
-        return len(self.towers[2]) == self.num_disks
+        return len(self.towers[-1]) == self.num_disks
     
     def get_state(self):
-        return (tuple(self.towers[0]), tuple(self.towers[1]), tuple(self.towers[2]))
+        return tuple(tuple(tower) for tower in self.towers)
     
     def set_state(self, state):
-        self.towers[0] = list(state[0])
-        self.towers[1] = list(state[1])
-        self.towers[2] = list(state[2])
+        if isinstance(state, int):
+            state = decode_state(state, self.num_disks, self.num_pegs)
+        self.towers = [list(tower) for tower in state]
+    
+    def get_encoded_state(self):
+        return encode_state(self.towers)
+    
+    def set_encoded_state(self, code):
+        self.set_state(decode_state(code, self.num_disks, self.num_pegs))
     
     def get_valid_moves(self):
         valid_moves = []
-        for from_tower in range(3):
-            for to_tower in range(3):
+        for from_tower in range(self.num_pegs):
+            for to_tower in range(self.num_pegs):
                 if from_tower != to_tower and self.is_valid_move(from_tower, to_tower):
                     valid_moves.append((from_tower, to_tower))
         return valid_moves
     
     def copy(self):
-        new_hanoi = TowerOfHanoi(self.num_disks)
+        new_hanoi = TowerOfHanoi(self.num_disks, self.num_pegs)
         new_hanoi.towers = [tower.copy() for tower in self.towers]
         return new_hanoi
\ No newline at end of file
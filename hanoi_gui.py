@@ -1,42 +1,88 @@
 import threading
-import time
 import random
-import imageio
-import io
-import numpy as np
-import tempfile
-import shutil
 from datetime import datetime
-from tkinter import Tk, StringVar, messagebox
-from tkinter import ttk, Canvas, Text
-from PIL import Image, ImageDraw
-from hanoi_game import TowerOfHanoi
+from tkinter import Tk, StringVar, messagebox, filedialog
+from tkinter import ttk, Canvas, Text, DoubleVar
+from hanoi_game import TowerOfHanoi, encode_state, decode_state, peg_bits, peg_masks, move_top_disk
+from hanoi_solver import optimal_moves, optimal_length, optimal_position
 from hanoi_search import EnhancedHanoiSearch
+from hanoi_heuristics import HEURISTICS, THREE_PEG_ONLY, available_heuristics
+from hanoi_cache import SolutionCache
+from hanoi_bridge import MessageChannel, CancelToken, Cancelled
+from hanoi_moves import MoveSequence
+
+FRAME_MS = 33
+POLL_MS = 30
+KEYFRAME_INTERVAL = 1024
+# Keyframes the builder thread collects before posting them to the Tk thread
+KEYFRAME_BATCH = 64
+SPEEDS = ["1", "2", "5", "20", "100", "1000", "10000"]
+ALGORITHMS = {"BFS": "bfs", "Layered BFS": "layered_bfs", "DFS": "dfs", "Bidirectional": "bidirectional",
+              "A*": "astar", "IDA*": "ida_star", "Optimal": "optimal", "Table lookup": "lookup",
+              "Frame-Stewart": "frame_stewart"}
+
+def worker_moves(moves):
+    """The solution for a worker thread, with a view of its own on a loaded file so the Tk thread can close its view"""
+    return MoveSequence(moves.path) if isinstance(moves, MoveSequence) else moves
+
+def close_moves(moves):
+    if isinstance(moves, MoveSequence):
+        moves.close()
 
 class EnhancedTowerOfHanoiGUI:
     def __init__(self):
         self.root = None
         self.num_disks = random.randint(2, 7)
-        self.game = TowerOfHanoi(self.num_disks)
+        self.num_pegs = 3
+        self.game = TowerOfHanoi(self.num_disks, self.num_pegs)
         self.game.randomize()
         self.initial_state = self.game.get_state()
         self.search = None
+        # Pressing Start again on a state already solved replays the cached solution
+        self.solution_cache = SolutionCache()
         self.solution_path = []
         self.search_thread = None
-        self.animation_thread = None
+        # Worker threads never touch Tk or the flags below; they post to channel, which
+        # poll_messages drains on the Tk thread, and watch their token for cancellation
+        self.channel = MessageChannel()
+        self.poll_job = None
+        self.search_token = None
+        self.render_token = None
+        self.play_job = None
+        self.playback_index = 0
+        self.closed_form = False
+        self.keyframes = []
+        self.seek_token = None
+        self.render_thread = None
         self.search_running = False
         self.animation_running = False
         self.animation_paused = False
         self.gif_frames = []
         
         self.canvas = None
+        self.canvas_layout = None
+        self.geometry = None
+        self.base_item = None
+        self.peg_items = []
+        self.disk_items = {}
+        self.rescale_job = None
         self.algorithm_var = None
         self.algorithm_selector = None
+        self.pegs_var = None
+        self.pegs_selector = None
+        self.heuristic_var = None
+        self.heuristic_selector = None
+        self.speed_var = None
+        self.speed_selector = None
+        self.seek_var = None
+        self.seek_bar = None
+        self.seeking = False
         self.start_btn = None
         self.pause_btn = None
         self.reset_btn = None
         self.randomize_btn = None
         self.create_gif_btn = None
+        self.load_btn = None
         self.status_var = None
         self.result_label = None
         self.stats_text = None
@@ -49,7 +95,7 @@ class EnhancedTowerOfHanoiGUI:
         style = ttk.Style()
         style.theme_use('clam')
         
-        self.search = EnhancedHanoiSearch(self.game, on_state_change=self.on_state_change, on_search_complete=self.on_search_complete)
+        self.search = EnhancedHanoiSearch(self.game, cache=self.solution_cache)
         
         main_frame = ttk.Frame(self.root, padding=10)
         main_frame.pack(fill="both", expand=True)
@@ -68,8 +114,8 @@ class EnhancedTowerOfHanoiGUI:
         
         ttk.Label(controls_frame, text="Algorithm:").grid(row=0, column=0, padx=5, pady=2, sticky="e")
         self.algorithm_var = StringVar(value="BFS")
-        self.algorithm_selector = ttk.Combobox(controls_frame, values=["BFS", "DFS", "Bidirectional"], 
-                                               textvariable=self.algorithm_var, width=12, state="readonly")
+        self.algorithm_selector = ttk.Combobox(controls_frame, textvariable=self.algorithm_var, width=12,
+                                               state="readonly")
         self.algorithm_selector.grid(row=0, column=1, padx=5, pady=2, sticky="w")
         
         self.start_btn = ttk.Button(controls_frame, text="Start Search", command=self.start_search)
@@ -84,9 +130,37 @@ class EnhancedTowerOfHanoiGUI:
         self.randomize_btn = ttk.Button(controls_frame, text="Randomize", command=self.randomize)
         self.randomize_btn.grid(row=0, column=5, padx=5, pady=2)
         
-        self.create_gif_btn = ttk.Button(controls_frame, text="Create GIF", command=self.create_solution_gif, state="disabled")
+        self.create_gif_btn = ttk.Button(controls_frame, text="Save Animation", command=self.create_solution_gif, state="disabled")
         self.create_gif_btn.grid(row=0, column=6, padx=5, pady=2)
         
+        self.load_btn = ttk.Button(controls_frame, text="Load Solution", command=self.load_solution)
+        self.load_btn.grid(row=0, column=7, padx=5, pady=2)
+        
+        ttk.Label(controls_frame, text="Pegs:").grid(row=1, column=0, padx=5, pady=2, sticky="e")
+        self.pegs_var = StringVar(value=str(self.num_pegs))
+        self.pegs_selector = ttk.Combobox(controls_frame, values=["3", "4", "5"], 
+                                          textvariable=self.pegs_var, width=12, state="readonly")
+        self.pegs_selector.grid(row=1, column=1, padx=5, pady=2, sticky="w")
+        self.pegs_selector.bind("<<ComboboxSelected>>", lambda event: self.randomize())
+        
+        ttk.Label(controls_frame, text="Heuristic:").grid(row=1, column=2, padx=5, pady=2, sticky="e")
+        self.heuristic_var = StringVar(value="Pattern database")
+        self.heuristic_selector = ttk.Combobox(controls_frame, textvariable=self.heuristic_var, width=16,
+                                               state="readonly")
+        self.heuristic_selector.grid(row=1, column=3, columnspan=2, padx=5, pady=2, sticky="w")
+        self.update_choices()
+        
+        ttk.Label(controls_frame, text="Moves/s:").grid(row=1, column=5, padx=5, pady=2, sticky="e")
+        self.speed_var = StringVar(value="2")
+        self.speed_selector = ttk.Combobox(controls_frame, values=SPEEDS, textvariable=self.speed_var,
+                                           width=8, state="readonly")
+        self.speed_selector.grid(row=1, column=6, padx=5, pady=2, sticky="w")
+        
+        ttk.Label(controls_frame, text="Move:").grid(row=2, column=0, padx=5, pady=2, sticky="e")
+        self.seek_var = DoubleVar(value=0)
+        self.seek_bar = ttk.Scale(controls_frame, from_=0, to=0, variable=self.seek_var, command=self.on_seek)
+        self.seek_bar.grid(row=2, column=1, columnspan=6, padx=5, pady=2, sticky="ew")
+        
         status_frame = ttk.Frame(main_frame)
         status_frame.pack(fill="x", pady=5)
         
@@ -107,8 +181,8 @@ class EnhancedTowerOfHanoiGUI:
         self.root.update()  # Ensure geometry is applied
         self.draw_towers()
 
-    def draw_towers(self):
-        self.canvas.delete("all")
+    def layout_canvas(self):
+        """Work out tower and disk geometry for the current canvas size"""
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
         
@@ -116,157 +190,164 @@ class EnhancedTowerOfHanoiGUI:
             canvas_width = 800
             canvas_height = 400
         
-        tower_width = 10
-        tower_height = canvas_height * 0.6
         base_width = canvas_width * 0.8
-        base_height = 20
-        
-        tower_x = [canvas_width * 0.25, canvas_width * 0.5, canvas_width * 0.75]
-        base_y = canvas_height * 0.7
-        tower_y = base_y - tower_height
-        
-        self.canvas.create_rectangle((canvas_width - base_width) / 2, base_y, 
-                                     (canvas_width + base_width) / 2, base_y + base_height, fill="brown")
-        
-        for x in tower_x:
-            self.canvas.create_rectangle(x - tower_width/2, tower_y, x + tower_width/2, base_y, fill="black")
-        
-        disk_height = 20
-        max_disk_width = base_width / 4
-        min_disk_width = max_disk_width / 3
-        
+        max_disk_width = base_width / (self.num_pegs + 1)
+        self.geometry = {
+            "width": canvas_width,
+            "tower_width": 10,
+            "tower_height": canvas_height * 0.6,
+            "base_width": base_width,
+            "base_height": 20,
+            "tower_x": [canvas_width * (i + 1) / (self.num_pegs + 1) for i in range(self.num_pegs)],
+            "base_y": canvas_height * 0.7,
+            "disk_height": 20,
+            "max_disk_width": max_disk_width,
+            "min_disk_width": max_disk_width / 3
+        }
+    
+    def base_coords(self):
+        g = self.geometry
+        return ((g["width"] - g["base_width"]) / 2, g["base_y"],
+                (g["width"] + g["base_width"]) / 2, g["base_y"] + g["base_height"])
+    
+    def peg_coords(self, tower_idx):
+        g = self.geometry
+        x = g["tower_x"][tower_idx]
+        return (x - g["tower_width"]/2, g["base_y"] - g["tower_height"], x + g["tower_width"]/2, g["base_y"])
+    
+    def disk_coords(self, disk, tower_idx, disk_idx):
+        g = self.geometry
+        disk_width = g["min_disk_width"] + (g["max_disk_width"] - g["min_disk_width"]) * (disk / self.num_disks)
+        disk_x = g["tower_x"][tower_idx]
+        disk_y = g["base_y"] - (disk_idx + 1) * g["disk_height"]
+        return disk_x - disk_width/2, disk_y - g["disk_height"], disk_x + disk_width/2, disk_y
+    
+    def build_canvas(self):
+        """Create the base, peg and disk items once per puzzle size and remember their ids"""
+        self.canvas.delete("all")
+        self.layout_canvas()
+        self.base_item = self.canvas.create_rectangle(*self.base_coords(), fill="brown")
+        self.peg_items = [self.canvas.create_rectangle(*self.peg_coords(i), fill="black")
+                          for i in range(self.num_pegs)]
+        self.disk_items = {}
+        for disk in range(1, self.num_disks + 1):
+            color_value = int(225 * disk / self.num_disks)
+            color = f"#{color_value:02x}00{255-color_value:02x}"
+            self.disk_items[disk] = self.canvas.create_rectangle(0, 0, 0, 0, fill=color, outline="black")
+        self.canvas_layout = (self.num_disks, self.num_pegs)
+    
+    def draw_towers(self):
+        """Move every disk item to its place in the current game state"""
+        if self.canvas_layout != (self.num_disks, self.num_pegs):
+            self.build_canvas()
         for tower_idx, tower in enumerate(self.game.towers):
             for disk_idx, disk in enumerate(tower):
-                disk_width = min_disk_width + (max_disk_width - min_disk_width) * (disk / self.num_disks)
-                disk_x = tower_x[tower_idx]
-                disk_y = base_y - (disk_idx + 1) * disk_height
-                color_value = int(225 * disk / self.num_disks)
-                color = f"#{color_value:02x}00{255-color_value:02x}"
-                self.canvas.create_rectangle(
-                    disk_x - disk_width/2, disk_y - disk_height,
-                    disk_x + disk_width/2, disk_y,
-                    fill=color, outline="black"
-                )
+                self.canvas.coords(self.disk_items[disk], *self.disk_coords(disk, tower_idx, disk_idx))
+    
+    def draw_disk(self, disk, tower_idx, disk_idx):
+        """Reposition the one disk a move has changed"""
+        self.canvas.coords(self.disk_items[disk], *self.disk_coords(disk, tower_idx, disk_idx))
+    
+    def schedule_rescale(self, event=None):
+        """Collapse a burst of resize events into one rescale once they stop"""
+        if self.rescale_job is not None:
+            self.root.after_cancel(self.rescale_job)
+        self.rescale_job = self.root.after(100, self.rescale_canvas)
+    
+    def rescale_canvas(self):
+        self.rescale_job = None
+        if self.canvas_layout != (self.num_disks, self.num_pegs):
+            self.draw_towers()
+            return
+        self.layout_canvas()
+        self.canvas.coords(self.base_item, *self.base_coords())
+        for tower_idx, item in enumerate(self.peg_items):
+            self.canvas.coords(item, *self.peg_coords(tower_idx))
+        self.draw_towers()
 
     def create_solution_gif(self):
-        """Create a GIF animation of the solution"""
+        """Save a GIF, MP4 or WebM animation of the solution, rendered off the Tk thread"""
         if not self.solution_path:
             messagebox.showinfo("Error", "No solution available to animate. Run the search first.")
             return
         
-        self.status_var.set("Creating GIF animation...")
-        
-        # Create temporary directory for frames
-        temp_dir = tempfile.mkdtemp()
-        
-        # Create game copy for animation
-        game_copy = TowerOfHanoi(self.num_disks)
-        game_copy.set_state(self.initial_state)
-        
-        # Save initial state
-        self.save_game_state_image(game_copy, f"{temp_dir}/frame_0.png")
-        
-        # Apply each move and save frames
-        for i, move in enumerate(self.solution_path):
-            game_copy.move(move[0], move[1])
-            self.save_game_state_image(game_copy, f"{temp_dir}/frame_{i+1}.png")
-        
-        # Create GIF
-        frames = []
-        for i in range(len(self.solution_path) + 1):
-            frames.append(Image.open(f"{temp_dir}/frame_{i}.png"))
-        
-        # Save GIF
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        gif_path = f"tower_of_hanoi_solution_{timestamp}.gif"
-        frames[0].save(
-            gif_path,
-            format='GIF',
-            append_images=frames[1:],
-            save_all=True,
-            duration=500,  # 0.5 seconds per frame
-            loop=0  # Loop forever
-        )
+        path = filedialog.asksaveasfilename(
+            initialfile=f"tower_of_hanoi_solution_{timestamp}.gif", defaultextension=".gif",
+            filetypes=[("GIF animation", "*.gif"), ("MP4 video", "*.mp4"), ("WebM video", "*.webm")])
+        if not path:
+            return
         
-        # Cleanup
-        shutil.rmtree(temp_dir)
+        self.status_var.set("Creating animation...")
+        self.render_token = CancelToken()
+        self.render_thread = threading.Thread(target=self.run_render, daemon=True,
+                                              args=(path, self.initial_state, worker_moves(self.solution_path),
+                                                    self.render_token))
+        self.render_thread.start()
+        self.update_button_states()
+    
+    def run_render(self, path, initial_state, moves, token):
+        """Worker thread: render the animation, posting progress and the outcome to the Tk thread"""
+        from hanoi_render import save_solution_animation
         
-        self.status_var.set(f"GIF animation saved as {gif_path}")
-        messagebox.showinfo("GIF Created", f"Solution animation saved as {gif_path}")
-
-    def save_game_state_image(self, game, filename):
-        """Save current game state as an image"""
-        width, height = 800, 400
-        image = Image.new("RGB", (width, height), "white")
-        draw = ImageDraw.Draw(image)
-        
-        # Tower dimensions
-        tower_width = 10
-        tower_height = height * 0.6
-        base_width = width * 0.8
-        base_height = 20
-        
-        # Tower positions
-        tower_x = [width * 0.25, width * 0.5, width * 0.75]
-        base_y = height * 0.7
-        tower_y = base_y - tower_height
-        
-        # Draw base
-        base_x = (width - base_width) / 2
-        draw.rectangle([base_x, base_y, base_x + base_width, base_y + base_height], fill="brown")
-        
-        # Draw towers
-        for x in tower_x:
-            draw.rectangle([x - tower_width/2, tower_y, x + tower_width/2, base_y], fill="black")
-        
-        # Disk dimensions
-        disk_height = 20
-        max_disk_width = base_width / 4
-        min_disk_width = max_disk_width / 3
-        
-        # Draw disks on towers
-        for tower_idx, tower in enumerate(game.towers):
-            for disk_idx, disk in enumerate(tower):
-                disk_width = min_disk_width + (max_disk_width - min_disk_width) * (disk / game.num_disks)
-                disk_x = tower_x[tower_idx]
-                disk_y = base_y - (disk_idx + 1) * disk_height
-                
-                # Colors based on disk size (simplified for PIL, matching canvas)
-                color_value = int(225 * disk / game.num_disks)
-                r, g, b = color_value, 0, 255 - color_value
-                draw.rectangle([
-                    disk_x - disk_width/2, disk_y - disk_height,
-                    disk_x + disk_width/2, disk_y
-                ], fill=(r, g, b), outline="black")
-        
-        image.save(filename)
+        def on_progress(frames, total):
+            token.check()
+            self.channel.post(token, self.status_var.set, f"Rendering frame {frames}/{total}", latest=True)
+        
+        try:
+            save_solution_animation(initial_state, moves, path, on_progress=on_progress)
+        except Cancelled:
+            return
+        except Exception as e:
+            self.channel.post(token, self.on_render_done, f"Error: {str(e)}", None)
+        else:
+            self.channel.post(token, self.on_render_done, f"Animation saved as {path}", path)
+        finally:
+            close_moves(moves)
+    
+    def on_render_done(self, status, path):
+        self.render_thread = None
+        self.status_var.set(status)
+        self.update_button_states()
+        if path:
+            messagebox.showinfo("Animation Saved", f"Solution animation saved as {path}")
 
     def update_button_states(self):
         if self.search_running or self.animation_running:
             self.start_btn.config(state="disabled")
-            self.pause_btn.config(state="normal" if self.animation_running else "disabled", 
-                                 text="Pause" if not self.animation_paused else "Resume")
+            paused = self.animation_paused if self.animation_running else self.search.paused
+            self.pause_btn.config(state="normal", text="Resume" if paused else "Pause")
             self.reset_btn.config(state="normal")
             self.randomize_btn.config(state="disabled")
             self.algorithm_selector.config(state="disabled")
+            self.pegs_selector.config(state="disabled")
+            self.heuristic_selector.config(state="disabled")
             self.create_gif_btn.config(state="disabled")
+            self.load_btn.config(state="disabled")
+            self.seek_bar.config(state="normal" if self.animation_running else "disabled")
         else:
             self.start_btn.config(state="normal")
             self.pause_btn.config(state="disabled", text="Pause")
             self.reset_btn.config(state="normal")
             self.randomize_btn.config(state="normal")
             self.algorithm_selector.config(state="readonly")
-            self.create_gif_btn.config(state="normal" if self.solution_path else "disabled")
+            self.pegs_selector.config(state="readonly")
+            self.heuristic_selector.config(state="readonly")
+            self.create_gif_btn.config(state="normal" if self.solution_path and not self.render_thread else "disabled")
+            self.load_btn.config(state="normal")
+            self.seek_bar.config(state="normal" if self.solution_path else "disabled")
 
     def reset(self):
         self.stop_threads()
         self.game.set_state(self.initial_state)
-        self.search = EnhancedHanoiSearch(self.game, on_state_change=self.on_state_change, on_search_complete=self.on_search_complete)
+        self.search = EnhancedHanoiSearch(self.game, cache=self.solution_cache)
         self.search_running = False
         self.animation_running = False
         self.animation_paused = False
-        self.solution_path = []
+        self.set_solution([])
         self.gif_frames = []
+        self.playback_index = 0
+        self.set_seek_bar(0, 0)
         self.status_var.set("Reset to initial state")
         self.draw_towers()
         self.result_label.config(text="")
@@ -275,19 +356,67 @@ class EnhancedTowerOfHanoiGUI:
         self.stats_text.config(state='disabled')
         self.update_button_states()
     
+    def update_choices(self):
+        """Offer only the algorithms and heuristics that hold for the current number of pegs"""
+        algorithms = [name for name in ALGORITHMS if self.num_pegs == 3 or ALGORITHMS[name] not in THREE_PEG_ONLY]
+        self.algorithm_selector.config(values=algorithms)
+        if self.algorithm_var.get() not in algorithms:
+            self.algorithm_var.set("BFS")
+        heuristics = available_heuristics(self.num_pegs)
+        self.heuristic_selector.config(values=heuristics)
+        if self.heuristic_var.get() not in heuristics:
+            self.heuristic_var.set("Pattern database")
+    
     def randomize(self):
         if self.search_running or self.animation_running:
             return
         self.num_disks = random.randint(2, 7)
-        self.game = TowerOfHanoi(self.num_disks)
+        self.num_pegs = int(self.pegs_var.get())
+        self.update_choices()
+        self.game = TowerOfHanoi(self.num_disks, self.num_pegs)
         self.game.randomize()
         self.initial_state = self.game.get_state()
-        self.search = EnhancedHanoiSearch(self.game, on_state_change=self.on_state_change, on_search_complete=self.on_search_complete)
+        self.search = EnhancedHanoiSearch(self.game, cache=self.solution_cache)
+        self.set_solution([])
+        self.playback_index = 0
+        self.set_seek_bar(0, 0)
         self.draw_towers()
-        self.status_var.set(f"Randomized with {self.num_disks} disks")
+        self.status_var.set(f"Randomized with {self.num_disks} disks on {self.num_pegs} pegs")
         self.result_label.config(text="")
         self.update_button_states()
     
+    def load_solution(self):
+        """Play back a solution saved in the packed move format, decoding moves as they are shown"""
+        if self.search_running or self.animation_running:
+            return
+        path = filedialog.askopenfilename(filetypes=[("Hanoi solution", "*.hmv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            sequence = MoveSequence(path)
+        except (OSError, ValueError) as e:
+            messagebox.showinfo("Error", f"Could not load solution: {str(e)}")
+            return
+        self.stop_threads()
+        self.num_disks = sequence.num_disks
+        self.num_pegs = sequence.num_pegs
+        self.pegs_var.set(str(self.num_pegs))
+        self.update_choices()
+        self.game = TowerOfHanoi(self.num_disks, self.num_pegs)
+        self.game.set_state(decode_state(sequence.start_state, self.num_disks, self.num_pegs))
+        self.initial_state = self.game.get_state()
+        self.search = EnhancedHanoiSearch(self.game, cache=self.solution_cache)
+        self.result_label.config(text="")
+        if len(sequence):
+            self.animate_solution(sequence)
+        else:
+            sequence.close()
+            self.set_solution([])
+            self.set_seek_bar(0, 0)
+            self.draw_towers()
+            self.update_button_states()
+            self.status_var.set(f"{path} holds no moves")
+    
     def start_search(self):
         if self.search_running or self.animation_running:
             return
@@ -298,79 +427,226 @@ class EnhancedTowerOfHanoiGUI:
         self.stats_text.delete(1.0, "end")
         self.stats_text.config(state='disabled')
         self.status_var.set("Searching for solution...")
-        self.search_thread = threading.Thread(target=self.run_search, daemon=True)
+        # The search gets its own copy of the start state and a token; both are read only by the worker
+        token = self.search_token = CancelToken()
+        self.search = EnhancedHanoiSearch(
+            self.game.copy(), cache=self.solution_cache,
+            on_progress=lambda progress: self.channel.post(token, self.on_progress, progress, latest=True),
+            on_search_complete=lambda *result: self.channel.post(token, self.on_search_complete, *result))
+        algorithm = self.algorithm_var.get()
+        heuristic = self.heuristic_var.get() if algorithm in ("A*", "IDA*") else None
+        self.search_thread = threading.Thread(target=self.run_search, daemon=True,
+                                              args=(self.search, token, ALGORITHMS[algorithm], heuristic))
         self.search_thread.start()
     
-    def run_search(self):
-        algorithm = self.algorithm_var.get()
+    def run_search(self, search, token, algorithm, heuristic):
+        """Worker thread: run the search and post its path, or the error, to the Tk thread"""
         try:
-            path = {"BFS": self.search.bfs, "DFS": self.search.dfs, "Bidirectional": self.search.bidirectional}[algorithm]()
-            if path and path != [] and not self.search.pause_search:
-                self.root.after(0, lambda: self.animate_solution(path))
-            elif path == []:
-                self.root.after(0, lambda: self.result_label.config(text="✗ No Solution Found", foreground="red"))
-                self.search_running = False
-                self.root.after(0, self.update_button_states)
+            if heuristic is not None:
+                game = search.initial_state
+                search.heuristic = HEURISTICS[heuristic](game.num_disks, game.num_pegs)
+            path = search.run(algorithm)
         except Exception as e:
-            self.root.after(0, lambda: self.status_var.set(f"Error: {str(e)}"))
-            self.root.after(0, self.on_search_fail)
+            self.channel.post(token, self.on_search_fail, f"Error: {str(e)}")
+        else:
+            self.channel.post(token, self.on_search_done, path)
+    
+    def on_search_done(self, path):
+        self.search_thread = None
+        if path:
+            self.animate_solution(path)
+        elif path == []:
+            self.result_label.config(text="✗ No Solution Found", foreground="red")
+            self.search_running = False
+            self.update_button_states()
     
     def toggle_pause(self):
+        if self.search_running and not self.animation_running:
+            if self.search.paused:
+                self.search.resume()
+            else:
+                self.search.pause()
+            self.update_button_states()
+            self.status_var.set(f"Search {'paused' if self.search.paused else 'resumed'}")
+            return
         if not self.animation_running:
             return
         self.animation_paused = not self.animation_paused
         self.update_button_states()
         self.status_var.set(f"Animation {'paused' if self.animation_paused else 'resumed'}")
+        if not self.animation_paused and self.play_job is None:
+            self.play_job = self.root.after(0, self.play_tick)
     
     def animate_solution(self, path):
         self.search_running = False
         self.animation_running = True
-        self.solution_path = path
+        self.animation_paused = False
+        self.set_solution(path)
+        self.prepare_seeking()
         self.game.set_state(self.initial_state)
+        self.playback_index = 0
+        self.set_seek_bar(0, len(path))
         self.draw_towers()
         self.update_button_states()
-        self.animation_thread = threading.Thread(target=self.run_animation, daemon=True)
-        self.animation_thread.start()
+        self.play_job = self.root.after(0, self.play_tick)
     
-    def run_animation(self):
-        if not self.solution_path:
-            self.status_var.set("No solution path to animate.")
-            self.animation_running = False
-            self.update_button_states()
+    def set_solution(self, moves):
+        """Replace the solution being shown, closing the file behind a loaded one"""
+        close_moves(self.solution_path)
+        self.solution_path = moves
+    
+    def prepare_seeking(self):
+        """Pick how to jump to any move: closed form for the 3-peg optimal path, else keyframes.
+
+        A solution as long as the optimum from its start is taken to be that optimum,
+        the only shortest path on three pegs, without a pass over the moves on the Tk
+        thread; build_keyframes checks it move by move while it collects keyframes.
+        """
+        if self.seek_token is not None:
+            self.seek_token.cancel()
+        initial_code = encode_state(self.initial_state)
+        self.closed_form = (self.num_pegs == 3
+                            and len(self.solution_path) == optimal_length(initial_code, self.num_disks))
+        self.keyframes = []
+        token = self.seek_token = CancelToken()
+        threading.Thread(target=self.build_keyframes, daemon=True,
+                         args=(worker_moves(self.solution_path), self.initial_state, self.closed_form, token)).start()
+    
+    def build_keyframes(self, moves, towers, closed_form, token):
+        """Worker thread: replay the solution on a packed code, posting the state every KEYFRAME_INTERVAL moves.
+
+        Illegal moves are skipped, as TowerOfHanoi.move does when position_at replays
+        from a keyframe; playback itself stops at the first one.
+        """
+        bits = peg_bits(len(towers))
+        code = encode_state(towers)
+        pegs = peg_masks(towers)
+        expected = optimal_moves(code, sum(len(tower) for tower in towers)) if closed_form else None
+        batch = []
+        try:
+            for i, (from_tower, to_tower) in enumerate(moves):
+                if i % KEYFRAME_INTERVAL == 0:
+                    batch.append(code)
+                    if len(batch) == KEYFRAME_BATCH:
+                        token.check()
+                        self.channel.post(token, self.keyframes.extend, batch)
+                        batch = []
+                if expected is not None and (from_tower, to_tower) != next(expected):
+                    expected = None
+                    self.channel.post(token, self.on_not_optimal)
+                disk = move_top_disk(pegs, from_tower, to_tower)
+                if disk:
+                    code ^= (from_tower ^ to_tower) << (bits * (disk.bit_length() - 1))
+        except Cancelled:
             return
-        self.gif_frames = []
+        finally:
+            close_moves(moves)
+        self.channel.post(token, self.keyframes.extend, batch)
+    
+    def on_not_optimal(self):
+        """The solution turned out not to be the optimal one; seek by keyframes from now on"""
+        self.closed_form = False
+    
+    def position_at(self, index):
+        """Return the packed state after the first index moves, replayed from the last keyframe built so far"""
+        if self.closed_form:
+            return optimal_position(encode_state(self.initial_state), self.num_disks, index)
+        game = TowerOfHanoi(self.num_disks, self.num_pegs)
+        keyframe = min(index // KEYFRAME_INTERVAL, len(self.keyframes) - 1)
+        if keyframe < 0:
+            game.set_state(self.initial_state)
+            keyframe = 0
+        else:
+            game.set_encoded_state(self.keyframes[keyframe])
+        for move in self.solution_path[keyframe * KEYFRAME_INTERVAL:index]:
+            game.move(move[0], move[1])
+        return game.get_encoded_state()
+    
+    def play_tick(self):
+        """Advance playback from the Tk loop, batching moves once they outpace the frame rate"""
+        self.play_job = None
+        if not self.animation_running or self.animation_paused:
+            return
+        rate = float(self.speed_var.get())
+        interval = max(FRAME_MS, int(1000 / rate))
         total_moves = len(self.solution_path)
-        for i, move in enumerate(self.solution_path):
-            if not self.animation_running:
+        start = self.playback_index
+        end = min(total_moves, start + max(1, round(rate * interval / 1000)))
+        for index, (from_tower, to_tower) in enumerate(self.solution_path[start:end], start):
+            if not self.game.move(from_tower, to_tower):
+                self.stop_on_illegal_move(index, from_tower, to_tower)
                 return
-            while self.animation_paused:
-                time.sleep(0.1)
-                if not self.animation_running:
-                    return
-            self.game.move(move[0], move[1])
-            self.root.after(0, self.draw_towers)
-            self.root.after(0, lambda i=i: self.status_var.set(f"Animating move {i+1}/{total_moves}"))
-            time.sleep(0.5)
+        if end - start == 1:
+            tower = self.game.towers[to_tower]
+            self.draw_disk(tower[-1], to_tower, len(tower) - 1)
+        elif end > start:
+            self.draw_towers()
+        self.playback_index = end
+        self.set_seek_bar(end)
+        self.status_var.set(f"Animating move {end}/{total_moves}")
+        if end < total_moves:
+            self.play_job = self.root.after(interval, self.play_tick)
+            return
         self.animation_running = False
-        self.root.after(0, lambda: self.status_var.set(
+        self.status_var.set(
             "Solution successfully completed!" if self.game.is_goal_state() else "Animation completed but goal state not reached."
-        ))
-        self.root.after(0, self.update_button_states)
+        )
+        self.update_button_states()
+    
+    def stop_on_illegal_move(self, index, from_tower, to_tower):
+        """End playback at a move the game rejects, showing the state the legal moves before it reached"""
+        self.draw_towers()
+        self.playback_index = index
+        self.set_seek_bar(index)
+        self.animation_running = False
+        self.status_var.set(f"Illegal move {index + 1} (tower {from_tower + 1} to {to_tower + 1}); playback stopped")
+        self.update_button_states()
+    
+    def set_seek_bar(self, index, total=None):
+        self.seeking = True
+        if total is not None:
+            self.seek_bar.config(to=total)
+        self.seek_var.set(index)
+        self.seeking = False
+    
+    def on_seek(self, value):
+        if self.seeking or not self.solution_path:
+            return
+        index = int(float(value))
+        if index == self.playback_index:
+            return
+        self.game.set_encoded_state(self.position_at(index))
+        self.playback_index = index
+        self.draw_towers()
+        self.status_var.set(f"Move {index}/{len(self.solution_path)}")
+        if not self.animation_running and index < len(self.solution_path):
+            # Seeking back into a finished playback picks it up again, paused at that move
+            self.animation_running = True
+            self.animation_paused = True
+            self.update_button_states()
+    
+    def poll_messages(self):
+        """Run whatever the worker threads posted, then check again in POLL_MS"""
+        self.channel.drain()
+        self.poll_job = self.root.after(POLL_MS, self.poll_messages)
     
-    def on_state_change(self, game_state, status, path):
-        self.root.after(0, lambda: self.status_var.set(f"{status}: Exploring state {len(path)} steps from start"))
+    def on_progress(self, progress):
+        if self.search.paused:
+            return
+        self.status_var.set(
+            f"Exploring depth {progress['depth']}: {progress['nodes_explored']} states explored, "
+            f"frontier {progress['frontier_size']}, {progress['nodes_per_sec']:.0f} states/s")
     
     def on_search_complete(self, success, path, stats):
-        self.root.after(0, lambda: self.result_label.config(
+        self.result_label.config(
             text="✓ Solution Found!" if success else "✗ No Solution Found",
             foreground="green" if success else "red"
-        ))
-        self.root.after(0, self.update_stats_display, stats)
-        if not self.animation_running:
-            self.search_running = False
-            self.root.after(0, self.update_button_states)
+        )
+        self.update_stats_display(stats)
     
-    def on_search_fail(self):
+    def on_search_fail(self, status):
+        self.search_thread = None
+        self.status_var.set(status)
         self.result_label.config(text="✗ Search Error", foreground="red")
         self.search_running = False
         self.animation_running = False
@@ -386,26 +662,33 @@ class EnhancedTowerOfHanoiGUI:
         self.stats_text.config(state='disabled')
     
     def stop_threads(self):
-        if self.search_thread and self.search_thread.is_alive():
-            self.search.pause_search = True
-            self.search_thread.join(timeout=0.1)
-        if self.animation_thread and self.animation_thread.is_alive():
-            self.animation_running = False
-            self.animation_thread.join(timeout=0.1)
+        """Cancel the running search; anything it still posts is dropped, and it exits at its next node"""
+        if self.search_token is not None:
+            self.search_token.cancel()
+            self.search_token = None
+        if self.seek_token is not None:
+            self.seek_token.cancel()
+            self.seek_token = None
+        if self.search_thread is not None:
+            self.search.stop()
+        if self.play_job is not None:
+            self.root.after_cancel(self.play_job)
+            self.play_job = None
+        self.animation_running = False
         self.search_thread = None
-        self.animation_thread = None
     
     def run(self):
         self.setup_gui()
         
-        def on_resize(event):
-            if event.widget == self.root:
-                self.draw_towers()
-        
-        self.root.bind("<Configure>", on_resize)
+        self.canvas.bind("<Configure>", self.schedule_rescale)
+        self.poll_messages()
         
         def on_close():
             self.stop_threads()
+            self.set_solution([])
+            if self.render_token is not None:
+                self.render_token.cancel()
+            self.root.after_cancel(self.poll_job)
             self.root.destroy()
         
         self.root.protocol("WM_DELETE_WINDOW", on_close)
@@ -0,0 +1,127 @@
+from array import array
+from collections import deque
+from hanoi_game import goal_code, packed_moves, peg_bits
+
+UNREACHED = 0xFFFF
+# Group-only distance tables keyed by (group size, num_pegs); shared by every PatternDatabase
+# and filled with shared-memory views inside batch worker processes
+PATTERN_TABLES = {}
+
+class DisksOffGoal:
+    """Count of disks not yet on the goal peg; every one of them must move at least once"""
+    def __init__(self, num_disks, num_pegs=3):
+        self.num_disks = num_disks
+        self.bits = peg_bits(num_pegs)
+        self.mask = (1 << self.bits) - 1
+        self.goal_peg = num_pegs - 1
+    
+    def __call__(self, code):
+        count = 0
+        for _ in range(self.num_disks):
+            if code & self.mask != self.goal_peg:
+                count += 1
+            code >>= self.bits
+        return count
+
+class LargestDisksDistance:
+    """Exact 3-peg distance to the goal counting only the largest disks.
+
+    Dropping the smaller disks only relaxes the puzzle, so the value never overestimates
+    and with all disks included it is the true distance.
+    """
+    def __init__(self, num_disks, num_largest=None, num_pegs=3):
+        if num_pegs != 3:
+            raise ValueError("LargestDisksDistance is only admissible on three pegs")
+        self.num_disks = num_disks
+        self.num_largest = num_disks if num_largest is None else min(num_largest, num_disks)
+    
+    def __call__(self, code):
+        target = 2
+        distance = 0
+        lowest = self.num_disks - self.num_largest
+        for disk in range(self.num_disks, lowest, -1):
+            peg = (code >> (2 * (disk - 1))) & 3
+            if peg != target:
+                distance += 1 << (disk - lowest - 1)
+                target = 3 - peg - target
+        return distance
+
+class PatternDatabase:
+    """Additive pattern database over disjoint groups of disks.
+
+    Each group is solved on its own, ignoring every other disk, by a breadth-first search
+    back from the goal. A move only ever shifts one disk, so it is charged to exactly one
+    group and the per-group distances can be summed without overestimating.
+    """
+    def __init__(self, num_disks, num_pegs=3, groups=None, group_size=8):
+        self.num_disks = num_disks
+        self.num_pegs = num_pegs
+        self.bits = peg_bits(num_pegs)
+        if groups is None:
+            groups = self.partition(num_disks, group_size)
+        self.groups = [sorted(group) for group in groups]
+        seen = [disk for group in self.groups for disk in group]
+        if len(seen) != len(set(seen)) or not all(1 <= disk <= num_disks for disk in seen):
+            raise ValueError("pattern database groups must be disjoint subsets of the disks")
+        self.tables = []
+    
+    @staticmethod
+    def partition(num_disks, group_size):
+        """Split the disks into consecutive groups, largest disks first"""
+        disks = list(range(num_disks, 0, -1))
+        return [disks[i:i + group_size] for i in range(0, num_disks, group_size)]
+    
+    def build(self):
+        self.tables = [self._table(len(group)) for group in self.groups]
+        return self
+    
+    def _table(self, size):
+        key = (size, self.num_pegs)
+        table = PATTERN_TABLES.get(key)
+        if table is None:
+            table = PATTERN_TABLES[key] = self._build_table(size)
+        return table
+    
+    def _build_table(self, size):
+        table = array("H", [UNREACHED]) * (1 << (self.bits * size))
+        goal = goal_code(size, self.num_pegs)
+        table[goal] = 0
+        queue = deque([goal])
+        while queue:
+            code = queue.popleft()
+            distance = table[code] + 1
+            for _, _, new_code in packed_moves(code, size, self.num_pegs):
+                if table[new_code] == UNREACHED:
+                    table[new_code] = distance
+                    queue.append(new_code)
+        return table
+    
+    def project(self, code, group):
+        """Pack the pegs of one group's disks into a code for the group-only puzzle"""
+        bits = self.bits
+        mask = (1 << bits) - 1
+        projected = 0
+        for i, disk in enumerate(group):
+            projected |= ((code >> (bits * (disk - 1))) & mask) << (bits * i)
+        return projected
+    
+    def __call__(self, code):
+        if not self.tables:
+            self.build()
+        return sum(table[self.project(code, group)] for group, table in zip(self.groups, self.tables))
+
+HEURISTICS = {
+    "Disks off goal": lambda num_disks, num_pegs: DisksOffGoal(num_disks, num_pegs),
+    "Largest disks": lambda num_disks, num_pegs: LargestDisksDistance(num_disks, max(1, num_disks // 2), num_pegs),
+    "Pattern database": lambda num_disks, num_pegs: PatternDatabase(num_disks, num_pegs, group_size=6).build(),
+}
+# What A* and IDA* use when no heuristic is set
+DEFAULT_HEURISTIC = "Disks off goal"
+
+# Heuristics, and the search methods, that hold on three pegs only; the GUI and CLI
+# offer the methods by these names too
+THREE_PEG_ONLY = {"Largest disks", "optimal", "lookup"}
+
+def available_heuristics(num_pegs):
+    """Names of the heuristics that are admissible with num_pegs pegs"""
+    return [name for name in HEURISTICS if num_pegs == 3 or name not in THREE_PEG_ONLY]
@@ -0,0 +1,165 @@
+import mmap
+import struct
+from hanoi_game import move_order, peg_bits
+
+MAGIC = b"HNMV"
+VERSION = 1
+# magic, version, pegs, bits per move, disks, move count
+HEADER = struct.Struct("<4sHBBHQ")
+FLUSH_BYTES = 1 << 16
+
+def move_width(num_pegs):
+    """Bits per move: an index into move_order(num_pegs), 3 bits for the 6 pairs of 3 pegs"""
+    return max(1, (len(move_order(num_pegs)) - 1).bit_length())
+
+def _state_bytes(num_disks, num_pegs):
+    return (peg_bits(num_pegs) * num_disks + 7) // 8
+
+class MoveWriter:
+    """Stream moves into a packed solution file.
+
+    The file holds a header, the packed start state, then each move as a fixed-width
+    index into move_order(), little-endian bit order. The move count in the header is
+    filled in on close, so moves can come from a generator of any length.
+    """
+    def __init__(self, path, start_state, num_disks, num_pegs=3):
+        self.path = path
+        self.num_disks = num_disks
+        self.num_pegs = num_pegs
+        self.width = move_width(num_pegs)
+        self._index = {move: index for index, move in enumerate(move_order(num_pegs))}
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, num_pegs, self.width, num_disks, 0))
+        self._file.write(start_state.to_bytes(_state_bytes(num_disks, num_pegs), "little"))
+        self._buffer = bytearray()
+        self._group = 0
+        self._pending = 0
+        self.count = 0
+
+    def write(self, from_tower, to_tower):
+        # Eight moves fill exactly width bytes, so whole groups are appended byte-aligned
+        self._group |= self._index[from_tower, to_tower] << (self.width * self._pending)
+        self._pending += 1
+        self.count += 1
+        if self._pending == 8:
+            self._buffer += self._group.to_bytes(self.width, "little")
+            self._group = self._pending = 0
+            if len(self._buffer) >= FLUSH_BYTES:
+                self._file.write(self._buffer)
+                self._buffer.clear()
+
+    def write_all(self, moves):
+        for from_tower, to_tower in moves:
+            self.write(from_tower, to_tower)
+        return self
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._pending:
+            self._buffer += self._group.to_bytes((self.width * self._pending + 7) // 8, "little")
+        self._file.write(self._buffer)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.num_pegs, self.width, self.num_disks, self.count))
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def save_moves(path, moves, start_state, num_disks, num_pegs=3):
+    with MoveWriter(path, start_state, num_disks, num_pegs) as writer:
+        writer.write_all(moves)
+    return path
+
+class MoveSequence:
+    """Read-only view of a packed solution file, memory-mapped.
+
+    Supports len(), iteration, and indexing or slicing by move number; move k is
+    decoded from the one or two bytes holding it, without touching the moves before it.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a solution file")
+            magic, version, self.num_pegs, self.width, self.num_disks, self.count = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} solution file")
+            state_length = _state_bytes(self.num_disks, self.num_pegs)
+            self.start_state = int.from_bytes(file.read(state_length), "little")
+            bits = peg_bits(self.num_pegs)
+            if any((self.start_state >> (bits * disk)) & ((1 << bits) - 1) >= self.num_pegs
+                   for disk in range(self.num_disks)):
+                raise ValueError(f"{path} has a start state with a disk on no peg 0-{self.num_pegs - 1}")
+            self._offset = HEADER.size + state_length
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) \
+                if self.count else b""
+        self.path = path
+        self._moves = move_order(self.num_pegs)
+        self._mask = (1 << self.width) - 1
+
+    def __len__(self):
+        return self.count
+
+    def _move(self, index):
+        bit = index * self.width
+        start = self._offset + (bit >> 3)
+        value = int.from_bytes(self._data[start:start + 2], "little")
+        return self._moves[(value >> (bit & 7)) & self._mask]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.moves(*index.indices(self.count)[:2])) if index.step in (None, 1) else \
+                [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("move index out of range")
+        return self._move(index)
+
+    def moves(self, start=0, stop=None):
+        """Yield moves start to stop, decoding a group of eight moves (width bytes) at a time"""
+        stop = self.count if stop is None else min(stop, self.count)
+        index = start
+        # Decode singly up to a group boundary, then whole byte-aligned groups
+        while index < stop and index % 8:
+            yield self._move(index)
+            index += 1
+        width, mask, moves, data = self.width, self._mask, self._moves, self._data
+        position = self._offset + index * width // 8
+        while index < stop:
+            value = int.from_bytes(data[position:position + width], "little")
+            for _ in range(min(8, stop - index)):
+                yield moves[value & mask]
+                value >>= width
+            index += 8
+            position += width
+
+    def __iter__(self):
+        return self.moves()
+
+    def index_chunks(self, size=1 << 20):
+        """Yield the move_order() index of every move as NumPy arrays of up to size moves, for bulk decoding"""
+        import numpy as np
+        size = max(8, size - size % 8)
+        weights = 1 << np.arange(self.width, dtype=np.uint8)
+        for first in range(0, self.count, size):
+            count = min(size, self.count - first)
+            start = self._offset + first * self.width // 8
+            raw = np.frombuffer(self._data[start:start + (count * self.width + 7) // 8], np.uint8)
+            bits = np.unpackbits(raw, bitorder="little")[:count * self.width]
+            yield bits.reshape(count, self.width) @ weights
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,227 @@
+import time
+from math import comb
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from hanoi_vector import next_layer
+
+EMPTY = np.uint64(0)
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+MAX_SLOTS = 2**26
+
+class SharedStateSet:
+    """Open-addressing hash set of packed states, with the depth of each, in shared memory.
+
+    Only the owning direction inserts; the other direction probes it concurrently.
+    Slots go from empty to filled and never back, and a depth is stored before its
+    key, so a reader sees either nothing or a complete entry. Keys are kept as
+    code + 1 so that zero marks an empty slot.
+    """
+    def __init__(self, slots, names=None):
+        self.slots = slots
+        self.bits = np.uint64(slots.bit_length() - 1)
+        if names is None:
+            # New shared memory is zero-filled, which is already every slot empty
+            self.memory = (SharedMemory(create=True, size=slots * 8), SharedMemory(create=True, size=slots * 4))
+        else:
+            self.memory = tuple(SharedMemory(name) for name in names)
+        self.keys = np.ndarray(slots, np.uint64, self.memory[0].buf)
+        self.depths = np.ndarray(slots, np.uint32, self.memory[1].buf)
+        self.size = 0
+
+    @property
+    def names(self):
+        return tuple(memory.name for memory in self.memory)
+
+    def _slots(self, keys):
+        return ((keys * HASH_MULTIPLIER) >> (np.uint64(64) - self.bits)).astype(np.int64)
+
+    def add(self, codes, depth):
+        """Insert states not already present, all at one depth"""
+        if self.size + len(codes) > self.slots * 3 // 4:
+            raise MemoryError(f"shared state set is full at {self.slots} slots")
+        keys = codes + np.uint64(1)
+        slots = self._slots(keys)
+        mask = self.slots - 1
+        while len(keys):
+            current = self.keys[slots]
+            empty = current == EMPTY
+            # Several keys may probe the same empty slot; the first of each claims it
+            _, first = np.unique(slots[empty], return_index=True)
+            claim = np.flatnonzero(empty)[first]
+            self.depths[slots[claim]] = depth
+            self.keys[slots[claim]] = keys[claim]
+            done = current == keys
+            done[claim] = True
+            self.size += len(claim)
+            keys, slots = keys[~done], (slots[~done] + 1) & mask
+
+    def lookup(self, codes):
+        """Return the depth of every state, -1 for those not (yet) in the set"""
+        result = np.full(len(codes), -1, dtype=np.int64)
+        keys = codes + np.uint64(1)
+        slots = self._slots(keys)
+        pending = np.arange(len(codes))
+        mask = self.slots - 1
+        while len(pending):
+            current = self.keys[slots]
+            found = current == keys
+            result[pending[found]] = self.depths[slots[found]]
+            more = ~found & (current != EMPTY)
+            pending, keys, slots = pending[more], keys[more], (slots[more] + 1) & mask
+        return result
+
+    def close(self, unlink=False):
+        del self.keys, self.depths
+        for memory in self.memory:
+            memory.close()
+            if unlink:
+                memory.unlink()
+
+def state_count(num_disks, num_pegs=3, symmetry=False):
+    """Number of states, or of canonical states when the non-goal pegs are interchangeable.
+
+    A canonical state is a set of disks on the goal peg and a partition of the rest
+    into at most num_pegs - 1 unlabelled stacks, counted here by Stirling numbers.
+    """
+    if not symmetry:
+        return num_pegs ** num_disks
+    # partitions[r][m]: ways to split r disks into m non-empty stacks
+    partitions = [[1] + [0] * (num_pegs - 1)]
+    for r in range(1, num_disks + 1):
+        previous = partitions[-1]
+        partitions.append([0] + [m * previous[m] + previous[m - 1] for m in range(1, num_pegs)])
+    return sum(comb(num_disks, r) * sum(partitions[r]) for r in range(num_disks + 1))
+
+def _direction(connection, root, num_disks, num_pegs, symmetry, own_names, other_names, slots):
+    """Worker process: breadth-first layers from root, one per "expand" command from the parent.
+
+    Successors are probed against the other direction's set as they are generated;
+    after both directions finish a layer, "check" probes the new layer again to catch
+    states the other side added in that same round.
+    """
+    own, other = SharedStateSet(slots, own_names), SharedStateSet(slots, other_names)
+    layer = np.array([root], dtype=np.uint64)
+    own.add(layer, 0)
+    layers = [(layer, layer)]
+    previous = layer[:0]
+    stats = {"nodes_explored": 0, "states_visited": 1, "max_frontier": 1, "expansion_time": 0.0}
+    try:
+        while True:
+            command, argument = connection.recv()
+            if command == "expand":
+                start = time.perf_counter()
+                stats["nodes_explored"] += len(layer)
+                successors, parents = next_layer(layer, (previous, layer), num_disks, num_pegs, symmetry)
+                previous, layer = layer, successors
+                layers.append((layer, parents))
+                own.add(layer, len(layers) - 1)
+                depths = other.lookup(layer)
+                stats["expansion_time"] += time.perf_counter() - start
+                stats["states_visited"] += len(layer)
+                stats["max_frontier"] = max(stats["max_frontier"], len(layer))
+                meets = np.flatnonzero(depths >= 0)
+                connection.send((len(layer), layer[meets].tolist(), depths[meets].tolist()))
+            elif command == "check":
+                depths = other.lookup(layer)
+                meets = np.flatnonzero(depths >= 0)
+                connection.send((layer[meets].tolist(), depths[meets].tolist()))
+            elif command == "chain":
+                code, depth = argument
+                states = []
+                for codes, parents in reversed(layers[:depth + 1]):
+                    states.append(code)
+                    code = int(parents[np.searchsorted(codes, code)])
+                connection.send(states[::-1])
+            elif command == "stats":
+                connection.send(stats)
+            else:
+                break
+    except Exception as e:
+        # Handed to the parent, which raises it in place of a bare EOFError on the pipe
+        try:
+            connection.send(e)
+        except OSError:
+            pass
+    finally:
+        own.close()
+        other.close()
+        connection.close()
+
+class ParallelBidirectional:
+    """Breadth-first layers from the start and from the goal, expanded concurrently in two processes.
+
+    Each round both processes expand one whole layer. Once no meeting has been seen
+    through depth k on either side, the shortest path has at least 2k + 1 moves, so
+    the first round that sees any meeting, checked at generation time and again
+    after both sides finish, holds a shortest one among its meetings.
+    """
+    def __init__(self, num_disks, num_pegs=3, symmetry=False):
+        self.num_disks = num_disks
+        self.num_pegs = num_pegs
+        self.symmetry = symmetry
+        states = state_count(num_disks, num_pegs, symmetry)
+        self.slots = min(MAX_SLOTS, 1 << (2 * states).bit_length())
+        self.sets = None
+        self.workers = []
+
+    def start(self, start_state, goal_state):
+        self.sets = (SharedStateSet(self.slots), SharedStateSet(self.slots))
+        for root, own, other in ((start_state, 0, 1), (goal_state, 1, 0)):
+            parent_end, child_end = Pipe()
+            process = Process(target=_direction, daemon=True,
+                              args=(child_end, root, self.num_disks, self.num_pegs, self.symmetry,
+                                    self.sets[own].names, self.sets[other].names, self.slots))
+            process.start()
+            child_end.close()
+            self.workers.append((process, parent_end))
+
+    def _ask(self, command, arguments=(None, None)):
+        for (_, connection), argument in zip(self.workers, arguments):
+            connection.send((command, argument))
+        replies = [connection.recv() for _, connection in self.workers]
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return replies
+
+    def round(self, depth):
+        """Expand one layer on each side and return (layer sizes, best meeting state, its depths) or no meeting"""
+        sizes, meetings = [], []
+        for side, (size, codes, depths) in enumerate(self._ask("expand")):
+            sizes.append(size)
+            meetings += [(depth + 1 + other, side, code, other) for code, other in zip(codes, depths)]
+        if not meetings:
+            for side, (codes, depths) in enumerate(self._ask("check")):
+                meetings += [(depth + 1 + other, side, code, other) for code, other in zip(codes, depths)]
+        if not meetings:
+            return sizes, None
+        length, side, code, other = min(meetings)
+        own = length - other
+        return sizes, (code, (own, other) if side == 0 else (other, own))
+
+    def chain(self, code, depths):
+        """Return the states from start to goal through code, which lies depths steps from each end"""
+        forward, backward = self._ask("chain", [(code, depths[0]), (code, depths[1])])
+        return forward + backward[-2::-1]
+
+    def stats(self):
+        forward, backward = self._ask("stats")
+        return {"forward": forward, "backward": backward}
+
+    def close(self):
+        for process, connection in self.workers:
+            if process.is_alive():
+                try:
+                    connection.send(("stop", None))
+                except OSError:
+                    pass
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+        self.workers = []
+        if self.sets:
+            for state_set in self.sets:
+                state_set.close(unlink=True)
+            self.sets = None
@@ -0,0 +1,121 @@
+import sys
+import time
+
+SAMPLE_STRIDE = 256
+
+def effective_branching_factor(nodes, depth):
+    """Solve nodes = 1 + b + b^2 + ... + b^depth for b by bisection"""
+    if depth <= 0 or nodes <= depth + 1:
+        return 1.0 if depth > 0 else 0.0
+    low, high = 1.0, float(nodes)
+    for _ in range(64):
+        middle = (low + high) / 2
+        total, term = 1.0, 1.0
+        for _ in range(depth):
+            term *= middle
+            total += term
+            if total > nodes:
+                break
+        if total > nodes:
+            high = middle
+        else:
+            low = middle
+    return (low + high) / 2
+
+class SearchProfile:
+    """Per-search instrumentation collected alongside search_stats.
+
+    Records nodes expanded per depth, successors generated, time inside the expander
+    and inside callbacks, and a sampled estimate of the bytes held by the visited and
+    frontier containers. Depths are the search's own where it keeps them, as A* and
+    IDA* do; otherwise they count from the root the expansion started from, so a
+    search resumed from a checkpoint profiles only the part it ran itself.
+    """
+    def __init__(self):
+        self.depth_nodes = []
+        self.generated = 0
+        self.expansion_time = 0.0
+        self.callback_time = 0.0
+        self.peak_structure_bytes = 0
+        self._containers = ()
+        self._tables = []
+        self._int_size = sys.getsizeof(2**40)
+        self.start()
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def count(self, depth, nodes=1):
+        while len(self.depth_nodes) <= depth:
+            self.depth_nodes.append(0)
+        self.depth_nodes[depth] += nodes
+
+    def wrap(self, expand, depth_of=None):
+        """Instrument a state expander: depth of every expanded state, successors and time taken.
+
+        depth_of maps an expanded state to its depth where the search tracks that already.
+        Otherwise this wrapper keeps its own table of depths, which is counted in the
+        sampled bytes.
+        """
+        depths = None
+        if depth_of is None:
+            depths = {}
+            self._tables.append(depths)
+            depth_of = lambda code: depths.get(code, 0)
+        expanded = 0
+
+        def instrumented(code):
+            nonlocal expanded
+            start = time.perf_counter()
+            successors = expand(code)
+            self.expansion_time += time.perf_counter() - start
+            depth = depth_of(code)
+            self.count(depth)
+            self.generated += len(successors)
+            if depths is not None:
+                for new_state in successors:
+                    if depths.get(new_state, depth + 2) > depth + 1:
+                        depths[new_state] = depth + 1
+            expanded += 1
+            if expanded % SAMPLE_STRIDE == 0:
+                self.sample()
+            return successors
+        return instrumented
+
+    def track(self, visited, *frontier):
+        """Containers to size: the visited table, whose keys own the state ints, then any frontiers"""
+        self._containers = (visited,) + frontier
+        self.sample()
+
+    def sample(self):
+        if not self._containers:
+            return
+        size = sum(sys.getsizeof(container) for container in self._containers)
+        size += len(self._containers[0]) * self._int_size
+        # Depth tables share their keys with the visited table, so only the tables count
+        size += sum(sys.getsizeof(table) for table in self._tables)
+        self.peak_structure_bytes = max(self.peak_structure_bytes, size)
+
+    def callback(self, start):
+        self.callback_time += time.perf_counter() - start
+
+    def summary(self, stats):
+        """Return the profile as plain data, with rates derived from the final search_stats"""
+        self.sample()
+        self._containers = ()
+        self._tables = []
+        nodes = sum(self.depth_nodes)
+        depth = len(self.depth_nodes) - 1
+        new_states = max(0, stats["states_visited"] - 1)
+        return {
+            "wall_time": time.perf_counter() - self._start,
+            "expansion_time": self.expansion_time,
+            "callback_time": self.callback_time,
+            "nodes_per_depth": list(self.depth_nodes),
+            "max_depth": max(depth, 0),
+            "mean_branching_factor": self.generated / nodes if self.generated else None,
+            "effective_branching_factor": effective_branching_factor(nodes, depth),
+            "successors_generated": self.generated,
+            "duplicate_rate": 1 - min(new_states, self.generated) / self.generated if self.generated else None,
+            "peak_structure_bytes": self.peak_structure_bytes
+        }
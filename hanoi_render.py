@@ -0,0 +1,193 @@
+import os
+from PIL import Image, ImageDraw, GifImagePlugin
+
+WIDTH, HEIGHT = 800, 400
+BACKGROUND, BASE, POLE, FIRST_DISK = 0, 1, 2, 3
+_backgrounds = {}
+_sprites = {}
+# codec and extra ffmpeg arguments per video extension; VP9 defaults to a very slow preset
+VIDEO_CODECS = {".mp4": ("libx264", []), ".webm": ("libvpx-vp9", ["-deadline", "realtime", "-cpu-used", "8"])}
+
+def disk_color(disk, num_disks):
+    """Colors based on disk size, matching the canvas"""
+    color_value = int(225 * disk / num_disks)
+    return color_value, 0, 255 - color_value
+
+def palette(num_disks):
+    colors = [(255, 255, 255), (165, 42, 42), (0, 0, 0)]
+    colors += [disk_color(disk, num_disks) for disk in range(1, num_disks + 1)]
+    colors += [(0, 0, 0)] * (256 - len(colors))
+    return [channel for color in colors for channel in color]
+
+class FrameRenderer:
+    """Keep one animation frame up to date a move at a time.
+
+    The base and poles are drawn once into a cached background and each disk once into a
+    cached sprite. A move restores the background under the disk's old position, pastes
+    its sprite at the new one and returns the dirty rectangle covering both.
+    """
+    def __init__(self, num_disks, num_pegs=3, width=WIDTH, height=HEIGHT):
+        self.num_disks = num_disks
+        self.num_pegs = num_pegs
+        self.width = width
+        self.height = height
+        
+        # Tower positions
+        self.tower_x = [width * (i + 1) / (num_pegs + 1) for i in range(num_pegs)]
+        self.base_y = height * 0.7
+        
+        # Disk dimensions
+        self.disk_height = 20
+        self.max_disk_width = width * 0.8 / (num_pegs + 1)
+        self.min_disk_width = self.max_disk_width / 3
+        
+        self.background = self._background()
+        self.frame = None
+        self.towers = None
+    
+    def _background(self):
+        key = (self.num_disks, self.num_pegs, self.width, self.height)
+        image = _backgrounds.get(key)
+        if image is not None:
+            return image
+        width, height = self.width, self.height
+        image = Image.new("P", (width, height), BACKGROUND)
+        image.putpalette(palette(self.num_disks))
+        draw = ImageDraw.Draw(image)
+        
+        # Tower dimensions
+        tower_width = 10
+        tower_height = height * 0.6
+        base_width = width * 0.8
+        base_height = 20
+        tower_y = self.base_y - tower_height
+        
+        # Draw base
+        base_x = (width - base_width) / 2
+        draw.rectangle([base_x, self.base_y, base_x + base_width, self.base_y + base_height], fill=BASE)
+        
+        # Draw towers
+        for x in self.tower_x:
+            draw.rectangle([x - tower_width/2, tower_y, x + tower_width/2, self.base_y], fill=POLE)
+        
+        _backgrounds[key] = image
+        return image
+    
+    def _sprite(self, disk):
+        key = (disk, self.num_disks, self.num_pegs, self.width)
+        sprite = _sprites.get(key)
+        if sprite is None:
+            disk_width = self.min_disk_width + (self.max_disk_width - self.min_disk_width) * (disk / self.num_disks)
+            sprite = Image.new("P", (int(disk_width) + 1, self.disk_height + 1), BACKGROUND)
+            ImageDraw.Draw(sprite).rectangle([0, 0, int(disk_width), self.disk_height],
+                                             fill=FIRST_DISK + disk - 1, outline=POLE)
+            _sprites[key] = sprite
+        return sprite
+    
+    def _box(self, disk, peg, level):
+        """Return the (left, top, right, bottom) crop box of a disk at a level on a peg"""
+        sprite = self._sprite(disk)
+        left = int(round(self.tower_x[peg] - (sprite.width - 1) / 2))
+        top = int(self.base_y) - (level + 1) * self.disk_height
+        return left, top, left + sprite.width, top + sprite.height
+    
+    def start(self, towers):
+        """Paint a full frame for a state given as towers of disks, bottom first"""
+        self.frame = self.background.copy()
+        self.towers = [list(tower) for tower in towers]
+        for peg, tower in enumerate(self.towers):
+            for level, disk in enumerate(tower):
+                self.frame.paste(self._sprite(disk), self._box(disk, peg, level)[:2])
+        return self.frame
+    
+    def move(self, from_tower, to_tower):
+        """Apply one move to the frame and return the dirty rectangle it touched"""
+        disk = self.towers[from_tower].pop()
+        old = self._box(disk, from_tower, len(self.towers[from_tower]))
+        new = self._box(disk, to_tower, len(self.towers[to_tower]))
+        self.towers[to_tower].append(disk)
+        self.frame.paste(self.background.crop(old), old[:2])
+        below = self.towers[from_tower]
+        if below:
+            # Stacked disks share an outline row, so restore the one the moved disk sat on
+            self.frame.paste(self._sprite(below[-1]), self._box(below[-1], from_tower, len(below) - 1)[:2])
+        self.frame.paste(self._sprite(disk), new[:2])
+        return min(old[0], new[0]), min(old[1], new[1]), max(old[2], new[2]), max(old[3], new[3])
+
+def render_state(game, width=WIDTH, height=HEIGHT):
+    """Draw a game state into a palette image: background, base, poles, then one entry per disk"""
+    return FrameRenderer(game.num_disks, game.num_pegs, width, height).start(game.towers)
+
+def save_game_state_image(game, filename):
+    """Save current game state as an image"""
+    render_state(game).save(filename)
+
+class AnimationWriter:
+    """Stream frames to a GIF, MP4 or WebM file as they are rendered.
+
+    GIF frames are encoded straight to the file against one global palette, so only the
+    current frame is held in memory; video frames are piped to ffmpeg through imageio.
+    """
+    def __init__(self, path, duration=500):
+        self.path = path
+        self.duration = duration
+        extension = os.path.splitext(path)[1].lower()
+        self._file = None
+        self._video = None
+        if extension == ".gif":
+            self._file = open(path, "wb")
+        elif extension in VIDEO_CODECS:
+            import imageio
+            import numpy as np
+            self._as_array = lambda frame: np.asarray(frame.convert("RGB"))
+            codec, output_params = VIDEO_CODECS[extension]
+            self._video = imageio.get_writer(path, fps=1000 / duration, codec=codec,
+                                             output_params=output_params, macro_block_size=1)
+        else:
+            raise ValueError(f"unsupported animation format: {extension or path}")
+        self.frames = 0
+    
+    def write(self, frame, dirty=None):
+        """Append a frame; a GIF after the first stores only the dirty rectangle, if one is given"""
+        if self._video is not None:
+            self._video.append_data(self._as_array(frame))
+        elif not self.frames:
+            header, _ = GifImagePlugin.getheader(frame, info={"optimize": False, "loop": 0})
+            self._file.write(b"".join(header))
+            self._file.write(b"".join(GifImagePlugin.getdata(frame, duration=self.duration)))
+        elif dirty is not None:
+            self._file.write(b"".join(GifImagePlugin.getdata(frame.crop(dirty), dirty[:2], duration=self.duration)))
+        else:
+            self._file.write(b"".join(GifImagePlugin.getdata(frame, duration=self.duration)))
+        self.frames += 1
+    
+    def close(self):
+        if self._video is not None:
+            self._video.close()
+        else:
+            self._file.write(b";")
+            self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def save_solution_animation(initial_state, moves, path, duration=500, on_progress=None):
+    """Render every state along a solution and stream them to a GIF, MP4 or WebM file.
+
+    on_progress, if given, is called with (frames written, total frames) after each frame.
+    """
+    renderer = FrameRenderer(sum(len(tower) for tower in initial_state), len(initial_state))
+    total = len(moves) + 1
+    with AnimationWriter(path, duration) as writer:
+        writer.write(renderer.start(initial_state))
+        if on_progress:
+            on_progress(1, total)
+        for from_tower, to_tower in moves:
+            dirty = renderer.move(from_tower, to_tower)
+            writer.write(renderer.frame, dirty)
+            if on_progress:
+                on_progress(writer.frames, total)
+    return path
@@ -1,13 +1,68 @@
+import heapq
+import threading
 import time
 from collections import deque
-from hanoi_game import TowerOfHanoi
+from hanoi_game import TowerOfHanoi, goal_code, packed_moves, move_between, canonical_code
+from hanoi_solver import optimal_solution, frame_stewart_solution
+from hanoi_heuristics import DEFAULT_HEURISTIC, HEURISTICS, DisksOffGoal
+from hanoi_checkpoint import save_checkpoint, load_checkpoint
+from hanoi_profile import SearchProfile
+
+CHECKPOINT_STRIDE = 1024
+PROGRESS_STRIDE = 64
+# States IDA* remembers across iterations; past this it still prunes on the ones it holds
+TRANSPOSITION_LIMIT = 1 << 20
+
+def state_chain(parents, code):
+    """Walk a predecessor table back to its root and return the states from the root to code"""
+    states = []
+    while code is not None:
+        states.append(code)
+        code = parents[code]
+    states.reverse()
+    return states
 
 class EnhancedHanoiSearch:
-    def __init__(self, initial_state, on_state_change=None, on_search_complete=None):
+    def __init__(self, initial_state, on_state_change=None, on_search_complete=None, symmetry=None,
+                 heuristic=None, checkpoint_path=None, checkpoint_interval=30.0,
+                 on_progress=None, progress_every=None, progress_interval=0.1, frontier_dir=None,
+                 memory_limit=None, instrument=False, profiler=None, cache=None):
         self.initial_state = initial_state
+        # run() answers from a SolutionCache when one is given and fills it otherwise
+        self.cache = cache
+        # instrument adds a SearchProfile summary to search_stats["profile"]; profiler is
+        # anything with enable()/disable(), such as cProfile.Profile, run around the search
+        self.profile = SearchProfile() if instrument else None
+        self.profiler = profiler
+        self._sizes = None
+        # external_bfs keeps its layers under frontier_dir (a temporary directory if unset)
+        # and sizes its in-memory chunks to stay near memory_limit bytes
+        self.frontier_dir = frontier_dir
+        self.memory_limit = memory_limit
+        # on_progress receives aggregated stats every progress_every nodes if set,
+        # otherwise every progress_interval seconds; unset, the searches skip it entirely
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.progress_interval = progress_interval
+        self._last_progress = (time.perf_counter(), 0)
+        self.heuristic = heuristic
+        # Set by use_heuristic(); a heuristic passed in as an object is not recorded
+        self.heuristic_name = None
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = time.perf_counter()
+        self._restored = None
         self.pause_search = False
+        # pause_search abandons the search; paused only suspends it in place
+        self.paused = False
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._idle_time = 0
         self.on_state_change = on_state_change
         self.on_search_complete = on_search_complete
+        # Collapse states that differ only by a permutation of the non-goal pegs;
+        # on by default for k > 3 pegs where the state space grows as k^n.
+        self.symmetry = initial_state.num_pegs > 3 if symmetry is None else symmetry
         self.search_stats = {
             "nodes_explored": 0,
             "states_visited": 0,
@@ -17,149 +72,648 @@ class EnhancedHanoiSearch:
             "path_length": 0
         }
     
+    @classmethod
+    def from_checkpoint(cls, path, on_state_change=None, on_search_complete=None, heuristic=None,
+                        checkpoint_path=None, checkpoint_interval=30.0, on_progress=None):
+        """Rebuild a search from a checkpoint file; continue_search() then picks up where it was written.
+
+        The heuristic is rebuilt from the name the checkpoint recorded. heuristic, a
+        HEURISTICS name, must match it, as the saved A* priorities were computed with it.
+        """
+        meta, sections = load_checkpoint(path)
+        saved = meta.get("heuristic")
+        if heuristic is not None and heuristic != (saved or DEFAULT_HEURISTIC):
+            raise ValueError(f"checkpoint was searched with heuristic {saved or DEFAULT_HEURISTIC!r}, "
+                             f"not {heuristic!r}")
+        game = TowerOfHanoi(meta["num_disks"], meta["num_pegs"])
+        game.set_encoded_state(meta["initial_state"])
+        search = cls(game, on_state_change, on_search_complete, symmetry=meta["symmetry"],
+                     checkpoint_path=path if checkpoint_path is None else checkpoint_path,
+                     checkpoint_interval=checkpoint_interval, on_progress=on_progress)
+        if saved is not None:
+            search.use_heuristic(saved)
+        search._restored = (meta, sections)
+        return search
+    
+    def use_heuristic(self, name):
+        """Set the heuristic by its HEURISTICS name, which checkpoints record for resuming"""
+        self.heuristic = HEURISTICS[name](self.initial_state.num_disks, self.initial_state.num_pegs)
+        self.heuristic_name = name
+    
+    def continue_search(self):
+        return getattr(self, self._restored[0]["algorithm"])()
+    
+    def _begin(self):
+        self._last_checkpoint = time.perf_counter()
+        self._last_progress = (self._last_checkpoint, self.search_stats["nodes_explored"])
+        self._sizes = None
+        if self.profile:
+            self.profile.start()
+        if self.profiler:
+            self.profiler.enable()
+    
+    def _track(self, peak, visited, *containers):
+        """Let the stats read the visited table and peak frontier size on demand, not every node"""
+        self._sizes = lambda: (len(visited), peak())
+        if self.profile:
+            self.profile.track(visited, *containers)
+    
+    def _sync_stats(self):
+        if self._sizes:
+            self.search_stats["states_visited"], self.search_stats["max_queue_size"] = self._sizes()
+    
+    def _restore(self, algorithm):
+        """Hand the tables of a loaded checkpoint to the search that wrote them, or None to start afresh"""
+        self._begin()
+        restored, self._restored = self._restored, None
+        if restored is None:
+            return None
+        meta, sections = restored
+        if meta["algorithm"] != algorithm:
+            raise ValueError(f"checkpoint was written by {meta['algorithm']}, not {algorithm}")
+        self.search_stats.update(meta["stats"])
+        # Credit the time spent before the checkpoint; _elapsed subtracts idle time
+        self._idle_time -= meta["stats"]["search_time"]
+        return sections
+    
+    def _checkpoint_due(self):
+        return (self.search_stats["nodes_explored"] % CHECKPOINT_STRIDE == 0
+                and time.perf_counter() - self._last_checkpoint >= self.checkpoint_interval)
+    
+    def save_checkpoint(self, algorithm, start_time, **sections):
+        self._sync_stats()
+        stats = dict(self.search_stats, search_time=time.perf_counter() - start_time - self._idle_time)
+        stats.pop("profile", None)
+        meta = {"algorithm": algorithm, "num_disks": self.initial_state.num_disks,
+                "num_pegs": self.initial_state.num_pegs, "symmetry": self.symmetry,
+                "heuristic": self.heuristic_name, "initial_state": self.initial_state.get_encoded_state(),
+                "stats": stats}
+        save_checkpoint(self.checkpoint_path, meta, sections)
+        self._last_checkpoint = time.perf_counter()
+    
+    def _progress_due(self):
+        nodes = self.search_stats["nodes_explored"]
+        if self.progress_every:
+            return nodes - self._last_progress[1] >= self.progress_every
+        return nodes % PROGRESS_STRIDE == 0 and time.perf_counter() - self._last_progress[0] >= self.progress_interval
+    
+    def _report(self, frontier_size, depth):
+        now, nodes = time.perf_counter(), self.search_stats["nodes_explored"]
+        since, last_nodes = self._last_progress
+        self._last_progress = (now, nodes)
+        self._sync_stats()
+        self.on_progress({
+            "nodes_explored": nodes,
+            "states_visited": self.search_stats["states_visited"],
+            "frontier_size": frontier_size,
+            "depth": depth,
+            "nodes_per_sec": (nodes - last_nodes) / (now - since) if now > since else 0.0
+        })
+        if self.profile:
+            self.profile.callback(now)
+    
+    def _endpoints(self):
+        num_disks, num_pegs = self.initial_state.num_disks, self.initial_state.num_pegs
+        start_state = self.initial_state.get_encoded_state()
+        if self.symmetry:
+            start_state = canonical_code(start_state, num_disks, num_pegs)
+        return start_state, goal_code(num_disks, num_pegs)
+    
+    def _expander(self, depth_of=None):
+        """Return a function mapping a packed state to its successor states.
+
+        depth_of, mapping an expanded state to its depth, spares the profile keeping
+        a depth table of its own where the search knows the depth already.
+        """
+        num_disks, num_pegs = self.initial_state.num_disks, self.initial_state.num_pegs
+        if self.symmetry:
+            expand = lambda code: [canonical_code(new_state, num_disks, num_pegs)
+                                   for _, _, new_state in packed_moves(code, num_disks, num_pegs)]
+        else:
+            expand = lambda code: [new_state for _, _, new_state in packed_moves(code, num_disks, num_pegs)]
+        return self.profile.wrap(expand, depth_of) if self.profile else expand
+    
+    def _moves_along(self, states):
+        """Turn a chain of adjacent (possibly canonical) states into the moves along it"""
+        num_disks, num_pegs = self.initial_state.num_disks, self.initial_state.num_pegs
+        if not self.symmetry:
+            return [move_between(states[i], states[i + 1], num_pegs) for i in range(len(states) - 1)]
+        # Canonical states hide the real peg labels; replay from the concrete first state,
+        # which is the start state or the goal (the goal is its own canonical form).
+        moves = []
+        current = states[0]
+        if current != goal_code(num_disks, num_pegs):
+            current = self.initial_state.get_encoded_state()
+        for target in states[1:]:
+            for from_tower, to_tower, new_state in packed_moves(current, num_disks, num_pegs):
+                if canonical_code(new_state, num_disks, num_pegs) == target:
+                    moves.append((from_tower, to_tower))
+                    current = new_state
+                    break
+        return moves
+    
+    def pause(self):
+        """Suspend a running search at its next expansion, keeping the frontier and visited tables"""
+        self._resume_event.clear()
+        self.paused = True
+    
+    def resume(self):
+        self.paused = False
+        self._resume_event.set()
+    
+    def stop(self):
+        """Abandon the search, waking it first if it is paused"""
+        self.pause_search = True
+        self.resume()
+    
+    def _hold(self):
+        """Block a paused search until it is resumed; return False if it was stopped meanwhile"""
+        paused_at = time.perf_counter()
+        self._resume_event.wait()
+        self._idle_time += time.perf_counter() - paused_at
+        return not self.pause_search
+    
+    def _elapsed(self, start_time):
+        elapsed = time.perf_counter() - start_time - self._idle_time
+        self._idle_time = 0
+        if self.profiler:
+            self.profiler.disable()
+        self._sync_stats()
+        if self.profile:
+            self.search_stats["profile"] = self.profile.summary(self.search_stats)
+        return elapsed
+    
+    def _notify(self, code, status, states):
+        started = time.perf_counter()
+        game = TowerOfHanoi(self.initial_state.num_disks, self.initial_state.num_pegs)
+        game.set_encoded_state(code)
+        self.on_state_change(game, status, self._moves_along(states))
+        if self.profile:
+            self.profile.callback(started)
+    
+    def _finish(self, path, start_time):
+        self.search_stats["success"] = True
+        self.search_stats["search_time"] = self._elapsed(start_time)
+        self.search_stats["path_length"] = len(path)
+        if self.on_search_complete:
+            self.on_search_complete(True, path, self.search_stats)
+        return path
+    
+    def _fail(self, start_time):
+        self.search_stats["search_time"] = self._elapsed(start_time)
+        if self.on_search_complete:
+            self.on_search_complete(False, [], self.search_stats)
+        return None if self.pause_search else []
+    
     def bfs(self):
-        start_time = time.time()
-        start_state = self.initial_state.get_state()
-        queue = deque([(start_state, [])])
-        visited = {start_state}
+        start_time = time.perf_counter()
+        start_state, goal_state = self._endpoints()
+        expand = self._expander()
+        restored = self._restore("bfs")
+        if restored:
+            queue, parents = deque(restored["queue"]), restored["parents"]
+        else:
+            queue, parents = deque([start_state]), {start_state: None}
+        peak = self.search_stats["max_queue_size"]
+        self._track(lambda: peak, parents, queue)
         
         while queue and not self.pause_search:
+            if self.paused and not self._hold():
+                break
+            if self.checkpoint_path and self._checkpoint_due():
+                self.save_checkpoint("bfs", start_time, queue=queue, parents=parents)
             self.search_stats["nodes_explored"] += 1
-            current_state, path = queue.popleft()
-            game = TowerOfHanoi(self.initial_state.num_disks)
-            game.set_state(current_state)
+            current_state = queue.popleft()
+            
+            if self.on_progress and self._progress_due():
+                self._report(len(queue), len(state_chain(parents, current_state)) - 1)
             
             if self.on_state_change:
-                self.on_state_change(game, "Exploring", path)
-            
-            if game.is_goal_state():
-                self.search_stats["success"] = True
-                self.search_stats["search_time"] = time.time() - start_time
-                self.search_stats["path_length"] = len(path)
-                if self.on_search_complete:
-                    self.on_search_complete(True, path, self.search_stats)
-                return path
-            
-            for move in game.get_valid_moves():
-                game_copy = game.copy()
-                game_copy.move(move[0], move[1])
-                new_state = game_copy.get_state()
-                if new_state not in visited:
-                    visited.add(new_state)
-                    queue.append((new_state, path + [move]))
-            
-            self.search_stats["states_visited"] = len(visited)
-            self.search_stats["max_queue_size"] = max(self.search_stats["max_queue_size"], len(queue))
-        
-        self.search_stats["search_time"] = time.time() - start_time
-        if self.on_search_complete:
-            self.on_search_complete(False, [], self.search_stats)
-        return None if self.pause_search else []
+                self._notify(current_state, "Exploring", state_chain(parents, current_state))
+            
+            if current_state == goal_state:
+                return self._finish(self._moves_along(state_chain(parents, current_state)), start_time)
+            
+            for new_state in expand(current_state):
+                if new_state not in parents:
+                    parents[new_state] = current_state
+                    queue.append(new_state)
+            
+            if len(queue) > peak:
+                peak = len(queue)
+        
+        return self._fail(start_time)
+
+    def layered_bfs(self):
+        """Breadth-first search a whole layer at a time with NumPy array operations.
+
+        Each layer is kept as sorted arrays of states and their parents, so the path is
+        recovered by binary search back through the layers instead of a parent dict.
+        """
+        import numpy as np
+        from hanoi_vector import next_layer
+        start_time = time.perf_counter()
+        self._begin()
+        num_disks, num_pegs = self.initial_state.num_disks, self.initial_state.num_pegs
+        start_state, goal_state = self._endpoints()
+        layer = np.array([start_state], dtype=np.uint64)
+        layers = [(layer, np.array([start_state], dtype=np.uint64))]
+        previous = layer[:0]
+        self.search_stats["states_visited"] = 1
+        
+        def chain(depth, code):
+            states = []
+            for codes, parents in reversed(layers[:depth + 1]):
+                states.append(code)
+                code = int(parents[np.searchsorted(codes, code)])
+            states.reverse()
+            return states
+        
+        while len(layer) and not self.pause_search:
+            if self.paused and not self._hold():
+                break
+            depth = len(layers) - 1
+            self.search_stats["nodes_explored"] += len(layer)
+            self.search_stats["max_queue_size"] = max(self.search_stats["max_queue_size"], len(layer))
+            
+            if self.on_progress:
+                self._report(len(layer), depth)
+            
+            if self.on_state_change:
+                self._notify(int(layer[0]), "Exploring", chain(depth, int(layer[0])))
+            
+            found = np.searchsorted(layer, goal_state)
+            if found < len(layer) and layer[found] == goal_state:
+                return self._finish(self._moves_along(chain(depth, goal_state)), start_time)
+            
+            expand_start = time.perf_counter()
+            successors, parents = next_layer(layer, (previous, layer), num_disks, num_pegs, self.symmetry)
+            if self.profile:
+                self.profile.count(depth, len(layer))
+                self.profile.expansion_time += time.perf_counter() - expand_start
+                held = sum(codes.nbytes + parents.nbytes for codes, parents in layers)
+                self.profile.peak_structure_bytes = max(self.profile.peak_structure_bytes, held)
+            previous, layer = layer, successors
+            layers.append((layer, parents))
+            self.search_stats["states_visited"] += len(layer)
+        
+        return self._fail(start_time)
+
+    def external_bfs(self):
+        """Breadth-first search with every layer in sorted files on disk instead of in memory"""
+        from hanoi_frontier import ExternalFrontier, DEFAULT_MEMORY_LIMIT
+        start_time = time.perf_counter()
+        self._begin()
+        num_disks, num_pegs = self.initial_state.num_disks, self.initial_state.num_pegs
+        start_state, goal_state = self._endpoints()
+        frontier = ExternalFrontier(num_disks, num_pegs, self.symmetry, self.frontier_dir,
+                                    self.memory_limit or DEFAULT_MEMORY_LIMIT)
+        try:
+            layer = frontier.start(start_state)
+            self.search_stats["states_visited"] = 1
+            while len(layer) and not self.pause_search:
+                if self.paused and not self._hold():
+                    break
+                depth = len(frontier.layers) - 1
+                self.search_stats["nodes_explored"] += len(layer)
+                self.search_stats["max_queue_size"] = max(self.search_stats["max_queue_size"], len(layer))
+                
+                if self.on_progress:
+                    self._report(len(layer), depth)
+                
+                if self.on_state_change:
+                    first = int(layer.states[0])
+                    self._notify(first, "Exploring", frontier.chain(first))
+                
+                if layer.contains([goal_state])[0]:
+                    return self._finish(self._moves_along(frontier.chain(goal_state)), start_time)
+                
+                if self.profile:
+                    self.profile.count(depth, len(layer))
+                expand_start = time.perf_counter()
+                layer = frontier.expand()
+                if self.profile:
+                    self.profile.expansion_time += time.perf_counter() - expand_start
+                self.search_stats["states_visited"] += len(layer)
+        finally:
+            frontier.close()
+        
+        return self._fail(start_time)
+
+    def parallel_bidirectional(self):
+        """Bidirectional BFS with each direction's layers expanded in its own process.
+
+        Meetings are detected as states are generated, through shared hash sets of
+        each side's states, and the path returned is a shortest one.
+        """
+        from hanoi_parallel import ParallelBidirectional
+        start_time = time.perf_counter()
+        self._begin()
+        start_state, goal_state = self._endpoints()
+        if start_state == goal_state:
+            return self._finish([], start_time)
+        search = ParallelBidirectional(self.initial_state.num_disks, self.initial_state.num_pegs, self.symmetry)
+        try:
+            search.start(start_state, goal_state)
+            self.search_stats["states_visited"] = 2
+            depth = 0
+            while not self.pause_search:
+                if self.paused and not self._hold():
+                    break
+                sizes, meeting = search.round(depth)
+                self.search_stats["states_visited"] += sum(sizes)
+                self.search_stats["max_queue_size"] = max(self.search_stats["max_queue_size"], sum(sizes))
+                depth += 1
+                
+                if self.on_progress:
+                    self._report(sum(sizes), depth)
+                
+                if meeting is not None:
+                    states = search.chain(*meeting)
+                    self.search_stats.update(search.stats())
+                    self.search_stats["nodes_explored"] = (self.search_stats["forward"]["nodes_explored"]
+                                                           + self.search_stats["backward"]["nodes_explored"])
+                    return self._finish(self._moves_along(states), start_time)
+                if not all(sizes):
+                    break
+            self.search_stats.update(search.stats())
+        finally:
+            search.close()
+        
+        return self._fail(start_time)
 
     def dfs(self):
-        start_time = time.time()
-        start_state = self.initial_state.get_state()
-        stack = [(start_state, [])]
-        visited = {start_state}
+        start_time = time.perf_counter()
+        start_state, goal_state = self._endpoints()
+        expand = self._expander()
+        restored = self._restore("dfs")
+        if restored:
+            stack, parents = list(restored["stack"]), restored["parents"]
+        else:
+            stack, parents = [start_state], {start_state: None}
+        peak = self.search_stats["max_queue_size"]
+        self._track(lambda: peak, parents, stack)
         
         while stack and not self.pause_search:
+            if self.paused and not self._hold():
+                break
+            if self.checkpoint_path and self._checkpoint_due():
+                self.save_checkpoint("dfs", start_time, stack=stack, parents=parents)
             self.search_stats["nodes_explored"] += 1
-            current_state, path = stack.pop()
-            game = TowerOfHanoi(self.initial_state.num_disks)
-            game.set_state(current_state)
+            current_state = stack.pop()
+            
+            if self.on_progress and self._progress_due():
+                self._report(len(stack), len(state_chain(parents, current_state)) - 1)
             
             if self.on_state_change:
-                self.on_state_change(game, "Exploring", path)
-            
-            if game.is_goal_state():
-                self.search_stats["success"] = True
-                self.search_stats["search_time"] = time.time() - start_time
-                self.search_stats["path_length"] = len(path)
-                if self.on_search_complete:
-                    self.on_search_complete(True, path, self.search_stats)
-                return path
-            
-            for move in reversed(game.get_valid_moves()):
-                game_copy = game.copy()
-                game_copy.move(move[0], move[1])
-                new_state = game_copy.get_state()
-                if new_state not in visited:
-                    visited.add(new_state)
-                    stack.append((new_state, path + [move]))
-            
-            self.search_stats["states_visited"] = len(visited)
-            self.search_stats["max_queue_size"] = max(self.search_stats["max_queue_size"], len(stack))
-        
-        self.search_stats["search_time"] = time.time() - start_time
-        if self.on_search_complete:
-            self.on_search_complete(False, [], self.search_stats)
-        return None if self.pause_search else []
+                self._notify(current_state, "Exploring", state_chain(parents, current_state))
+            
+            if current_state == goal_state:
+                return self._finish(self._moves_along(state_chain(parents, current_state)), start_time)
+            
+            for new_state in reversed(expand(current_state)):
+                if new_state not in parents:
+                    parents[new_state] = current_state
+                    stack.append(new_state)
+            
+            if len(stack) > peak:
+                peak = len(stack)
+        
+        return self._fail(start_time)
 
     def bidirectional(self):
-        start_time = time.time()
-        start_state = self.initial_state.get_state()
-        goal_state = (tuple(), tuple(), tuple(range(self.initial_state.num_disks, 0, -1)))
+        start_time = time.perf_counter()
+        start_state, goal_state = self._endpoints()
+        # One expander per direction, so a profile keeps their depths apart
+        expand_forward, expand_backward = self._expander(), self._expander()
+        
+        restored = self._restore("bidirectional")
+        if restored:
+            forward_queue, backward_queue = deque(restored["forward_queue"]), deque(restored["backward_queue"])
+            forward_parents, backward_parents = restored["forward_parents"], restored["backward_parents"]
+        else:
+            forward_queue, backward_queue = deque([start_state]), deque([goal_state])
+            forward_parents, backward_parents = {start_state: None}, {goal_state: None}
+        peak = self.search_stats["max_queue_size"]
+        self._sizes = lambda: (len(forward_parents) + len(backward_parents), peak)
+        if self.profile:
+            self.profile.track(forward_parents, backward_parents, forward_queue, backward_queue)
         
-        forward_queue = deque([(start_state, [])])
-        backward_queue = deque([(goal_state, [])])
-        forward_visited = {start_state: []}
-        backward_visited = {goal_state: []}
+        def meet(state):
+            states = state_chain(forward_parents, state) + state_chain(backward_parents, state)[-2::-1]
+            return self._finish(self._moves_along(states), start_time)
         
         while forward_queue and backward_queue and not self.pause_search:
+            if self.paused and not self._hold():
+                break
+            if self.checkpoint_path and self._checkpoint_due():
+                self.save_checkpoint("bidirectional", start_time, forward_queue=forward_queue,
+                                     backward_queue=backward_queue, forward_parents=forward_parents,
+                                     backward_parents=backward_parents)
             self.search_stats["nodes_explored"] += 1
             
-            current_state, path = forward_queue.popleft()
-            game = TowerOfHanoi(self.initial_state.num_disks)
-            game.set_state(current_state)
+            current_state = forward_queue.popleft()
+            
+            if self.on_progress and self._progress_due():
+                self._report(len(forward_queue) + len(backward_queue),
+                             len(state_chain(forward_parents, current_state)) - 1)
             
             if self.on_state_change:
-                self.on_state_change(game, "Exploring Forward", path)
-            
-            if current_state in backward_visited:
-                self.search_stats["success"] = True
-                self.search_stats["search_time"] = time.time() - start_time
-                full_path = path + list(reversed(backward_visited[current_state]))
-                self.search_stats["path_length"] = len(full_path)
-                if self.on_search_complete:
-                    self.on_search_complete(True, full_path, self.search_stats)
-                return full_path
-            
-            for move in game.get_valid_moves():
-                game_copy = game.copy()
-                game_copy.move(move[0], move[1])
-                new_state = game_copy.get_state()
-                if new_state not in forward_visited:
-                    forward_visited[new_state] = path + [move]
-                    forward_queue.append((new_state, path + [move]))
-            
-            current_state, path = backward_queue.popleft()
-            game.set_state(current_state)
+                self._notify(current_state, "Exploring Forward", state_chain(forward_parents, current_state))
+            
+            if current_state in backward_parents:
+                return meet(current_state)
+            
+            for new_state in expand_forward(current_state):
+                if new_state not in forward_parents:
+                    forward_parents[new_state] = current_state
+                    forward_queue.append(new_state)
+            
+            current_state = backward_queue.popleft()
             
             if self.on_state_change:
-                self.on_state_change(game, "Exploring Backward", path)
-            
-            if current_state in forward_visited:
-                self.search_stats["success"] = True
-                self.search_stats["search_time"] = time.time() - start_time
-                full_path = forward_visited[current_state] + list(reversed(path))
-                self.search_stats["path_length"] = len(full_path)
-                if self.on_search_complete:
-                    self.on_search_complete(True, full_path, self.search_stats)
-                return full_path
-            
-            for move in game.get_valid_moves():
-                game_copy = game.copy()
-                game_copy.move(move[0], move[1])
-                new_state = game_copy.get_state()
-                if new_state not in backward_visited:
-                    backward_visited[new_state] = path + [move]
-                    backward_queue.append((new_state, path + [move]))
-            
-            self.search_stats["states_visited"] = len(forward_visited) + len(backward_visited)
-            self.search_stats["max_queue_size"] = max(self.search_stats["max_queue_size"], 
-                                                    len(forward_queue) + len(backward_queue))
-        
-        self.search_stats["search_time"] = time.time() - start_time
-        if self.on_search_complete:
-            self.on_search_complete(False, [], self.search_stats)
-        return None if self.pause_search else []
\ No newline at end of file
+                self._notify(current_state, "Exploring Backward", state_chain(backward_parents, current_state))
+            
+            if current_state in forward_parents:
+                return meet(current_state)
+            
+            for new_state in expand_backward(current_state):
+                if new_state not in backward_parents:
+                    backward_parents[new_state] = current_state
+                    backward_queue.append(new_state)
+            
+            if len(forward_queue) + len(backward_queue) > peak:
+                peak = len(forward_queue) + len(backward_queue)
+        
+        return self._fail(start_time)
+
+    def run(self, algorithm):
+        """Run a search by method name, going through the solution cache if there is one"""
+        if self.cache is None:
+            return getattr(self, algorithm)()
+        start_time = time.perf_counter()
+        code = self.initial_state.get_encoded_state()
+        num_disks, num_pegs = self.initial_state.num_disks, self.initial_state.num_pegs
+        path = self.cache.get(code, num_disks, num_pegs, algorithm)
+        if path is not None:
+            self.search_stats["cached"] = True
+            return self._finish(path, start_time)
+        path = getattr(self, algorithm)()
+        if self.search_stats["success"]:
+            self.cache.put(code, num_disks, num_pegs, algorithm, path)
+        return path
+
+    def _heuristic(self):
+        if self.heuristic is None:
+            return DisksOffGoal(self.initial_state.num_disks, self.initial_state.num_pegs)
+        return self.heuristic
+
+    def astar(self):
+        start_time = time.perf_counter()
+        start_state, goal_state = self._endpoints()
+        heuristic = self._heuristic()
+        # Entries are (f, -g, state): ties on f prefer the deeper node
+        restored = self._restore("astar")
+        if restored:
+            costs, parents = restored["costs"], restored["parents"]
+            heap = [(f, -costs[state], state) for f, state in zip(restored["heap_f"], restored["heap"])]
+            heapq.heapify(heap)
+        else:
+            heap = [(heuristic(start_state), 0, start_state)]
+            costs, parents = {start_state: 0}, {start_state: None}
+        expand = self._expander(costs.__getitem__)
+        peak = self.search_stats["max_queue_size"]
+        self._track(lambda: peak, costs, parents, heap)
+        
+        while heap and not self.pause_search:
+            if self.paused and not self._hold():
+                break
+            if self.checkpoint_path and self._checkpoint_due():
+                # Stale heap entries are dropped; the live ones are rebuilt from their f and costs
+                live = [(f, state) for f, neg_cost, state in heap if -neg_cost == costs[state]]
+                self.save_checkpoint("astar", start_time, heap=[state for _, state in live],
+                                     heap_f=[f for f, _ in live], costs=costs, parents=parents)
+            _, neg_cost, current_state = heapq.heappop(heap)
+            cost = -neg_cost
+            if cost != costs[current_state]:
+                continue
+            self.search_stats["nodes_explored"] += 1
+            
+            if self.on_progress and self._progress_due():
+                self._report(len(heap), cost)
+            
+            if self.on_state_change:
+                self._notify(current_state, "Exploring", state_chain(parents, current_state))
+            
+            if current_state == goal_state:
+                return self._finish(self._moves_along(state_chain(parents, current_state)), start_time)
+            
+            cost += 1
+            for new_state in expand(current_state):
+                if cost < costs.get(new_state, cost + 1):
+                    costs[new_state] = cost
+                    parents[new_state] = current_state
+                    heapq.heappush(heap, (cost + heuristic(new_state), -cost, new_state))
+            
+            if len(heap) > peak:
+                peak = len(heap)
+        
+        return self._fail(start_time)
+
+    def ida_star(self, transposition_limit=TRANSPOSITION_LIMIT):
+        """Iterative-deepening A* with a bounded transposition table.
+
+        The table keeps the smallest depth each state has been reached at and the bound of
+        the iteration that last expanded it from there. A state reached deeper than that is
+        pruned, as the shallower route lies within every later bound too; one reached at
+        that depth again is pruned if this iteration already expanded it. Past
+        transposition_limit states no new ones are added, so memory stays bounded, and
+        states_visited counts the distinct states the table holds.
+        """
+        start_time = time.perf_counter()
+        start_state, goal_state = self._endpoints()
+        expand = self._expander(lambda code: len(path) - 1)
+        heuristic = self._heuristic()
+        bound = heuristic(start_state)
+        self._begin()
+        table = {}
+        peak = self.search_stats["max_queue_size"]
+        self._track(lambda: peak, table)
+        
+        while not self.pause_search:
+            path = [start_state]
+            on_path = {start_state}
+            table[start_state] = (0, bound)
+            children = [iter(expand(start_state))]
+            next_bound = None
+            self.search_stats["nodes_explored"] += 1
+            if start_state == goal_state:
+                return self._finish([], start_time)
+            
+            while children and not self.pause_search:
+                if self.paused and not self._hold():
+                    break
+                depth = len(path)
+                for new_state in children[-1]:
+                    if new_state in on_path:
+                        continue
+                    best, expanded = table.get(new_state, (depth, None))
+                    if best < depth or best == depth and expanded == bound:
+                        continue
+                    estimate = depth + heuristic(new_state)
+                    if estimate > bound:
+                        if next_bound is None or estimate < next_bound:
+                            next_bound = estimate
+                        continue
+                    self.search_stats["nodes_explored"] += 1
+                    if new_state in table or len(table) < transposition_limit:
+                        table[new_state] = (depth, bound)
+                    path.append(new_state)
+                    on_path.add(new_state)
+                    
+                    if self.on_progress and self._progress_due():
+                        self._report(len(path), len(path) - 1)
+                    
+                    if self.on_state_change:
+                        self._notify(new_state, "Exploring", path)
+                    
+                    if new_state == goal_state:
+                        return self._finish(self._moves_along(path), start_time)
+                    children.append(iter(expand(new_state)))
+                    if len(path) > peak:
+                        peak = len(path)
+                    break
+                else:
+                    children.pop()
+                    on_path.discard(path.pop())
+            
+            if next_bound is None:
+                break
+            bound = next_bound
+        
+        return self._fail(start_time)
+
+    def optimal(self):
+        """Solve directly with the largest-misplaced-disk decomposition, no state space search (3 pegs only)"""
+        if self.initial_state.num_pegs != 3:
+            raise ValueError("optimal solves three pegs only; frame_stewart handles more, "
+                             "without a guarantee of the shortest path")
+        start_time = time.perf_counter()
+        path = optimal_solution(self.initial_state.get_encoded_state(), self.initial_state.num_disks)
+        return self._finish(path, start_time)
+
+    def lookup(self):
+        """Follow the precomputed next-move table, one lookup per move (3 pegs only)"""
+        if self.initial_state.num_pegs != 3:
+            raise ValueError("lookup tables cover three pegs only")
+        from hanoi_tables import open_table
+        start_time = time.perf_counter()
+        table = open_table(self.initial_state.num_disks)
+        path = table.solution(self.initial_state.get_encoded_state())
+        return self._finish(path, start_time)
+
+    def frame_stewart(self):
+        start_time = time.perf_counter()
+        path = frame_stewart_solution(self.initial_state.get_encoded_state(), self.initial_state.num_disks,
+                                      self.initial_state.num_pegs)
+        return self._finish(path, start_time)
@@ -0,0 +1,134 @@
+from hanoi_game import PEG_MASK, encode_state, goal_code, peg_bits
+
+_split_cache = {}
+
+def _as_code(state):
+    return state if isinstance(state, int) else encode_state(state)
+
+def tower_moves(num_disks, source, target, spare):
+    """Yield the 2^n - 1 moves that carry a perfect tower from source to target"""
+    # The binary formula below carries a tower from label 0 to label 2 for an odd
+    # number of disks and to label 1 for an even one; map those labels onto real pegs.
+    if num_disks % 2:
+        labels = (source, spare, target)
+    else:
+        labels = (source, target, spare)
+    for i in range(1, 1 << num_disks):
+        yield labels[(i & (i - 1)) % 3], labels[((i | (i - 1)) + 1) % 3]
+
+def _misplaced_segments(state, num_disks, target, num_pegs=3):
+    """Decompose a state into (disk, from_peg, to_peg, spare) steps, largest misplaced disk first"""
+    code = _as_code(state)
+    bits = peg_bits(num_pegs)
+    mask = (1 << bits) - 1
+    segments = []
+    for disk in range(num_disks, 0, -1):
+        peg = (code >> (bits * (disk - 1))) & mask
+        if peg != target:
+            spare = next(p for p in range(num_pegs) if p != peg and p != target)
+            segments.append((disk, peg, target, spare))
+            target = spare
+    return segments
+
+def optimal_moves(state, num_disks, target=2):
+    """Lazily yield the optimal moves from any legal state to a perfect tower on target"""
+    for disk, from_peg, to_peg, spare in reversed(_misplaced_segments(state, num_disks, target)):
+        yield from_peg, to_peg
+        yield from tower_moves(disk - 1, spare, to_peg, from_peg)
+
+def optimal_solution(state, num_disks, target=2):
+    return list(optimal_moves(state, num_disks, target))
+
+def optimal_length(state, num_disks, target=2):
+    return sum(1 << (disk - 1) for disk, _, _, _ in _misplaced_segments(state, num_disks, target))
+
+def frame_stewart_split(num_disks, num_pegs):
+    """Return (moves, k) for the Frame-Stewart recurrence: park k disks, move the rest, restack"""
+    key = (num_disks, num_pegs)
+    cached = _split_cache.get(key)
+    if cached is not None:
+        return cached
+    if num_disks == 0:
+        result = (0, 0)
+    elif num_disks == 1:
+        result = (1, 0)
+    elif num_pegs == 3:
+        result = ((1 << num_disks) - 1, num_disks - 1)
+    else:
+        result = min((2 * frame_stewart_split(k, num_pegs)[0] + frame_stewart_split(num_disks - k, num_pegs - 1)[0], k)
+                     for k in range(1, num_disks))
+    _split_cache[key] = result
+    return result
+
+def frame_stewart_length(num_disks, num_pegs):
+    return frame_stewart_split(num_disks, num_pegs)[0]
+
+def frame_stewart_tower_moves(num_disks, source, target, spares):
+    """Yield the Frame-Stewart moves carrying a perfect tower from source to target over the spare pegs"""
+    if num_disks == 0:
+        return
+    if num_disks == 1:
+        yield source, target
+        return
+    if len(spares) == 1:
+        yield from tower_moves(num_disks, source, target, spares[0])
+        return
+    _, parked = frame_stewart_split(num_disks, len(spares) + 2)
+    middle, rest = spares[0], list(spares[1:])
+    yield from frame_stewart_tower_moves(parked, source, middle, [target] + rest)
+    yield from frame_stewart_tower_moves(num_disks - parked, source, target, rest)
+    yield from frame_stewart_tower_moves(parked, middle, target, [source] + rest)
+
+def frame_stewart_moves(state, num_disks, num_pegs, target=None):
+    """Lazily yield a k-peg solution from any legal state to a perfect tower on target.
+
+    Each misplaced disk is handled as in optimal_moves and the sub-tower above it is
+    restacked with the Frame-Stewart algorithm. From a perfect starting tower this is
+    the presumed-optimal Frame-Stewart sequence; on three pegs it is exactly optimal.
+    """
+    if target is None:
+        target = num_pegs - 1
+    if num_pegs == 3:
+        yield from optimal_moves(state, num_disks, target)
+        return
+    state = _as_code(state)
+    source = state & ((1 << peg_bits(num_pegs)) - 1)
+    if num_disks and state == goal_code(num_disks, num_pegs, source):
+        # A perfect tower goes through the recursion proper; restacking it disk by disk takes more moves
+        if source != target:
+            yield from frame_stewart_tower_moves(num_disks, source, target,
+                                                 [peg for peg in range(num_pegs) if peg not in (source, target)])
+        return
+    for disk, from_peg, to_peg, spare in reversed(_misplaced_segments(state, num_disks, target, num_pegs)):
+        yield from_peg, to_peg
+        others = [peg for peg in range(num_pegs) if peg != spare and peg != to_peg]
+        yield from frame_stewart_tower_moves(disk - 1, spare, to_peg, others)
+
+def frame_stewart_solution(state, num_disks, num_pegs, target=None):
+    return list(frame_stewart_moves(state, num_disks, num_pegs, target))
+
+def tower_position(num_disks, moves_done, source, target, spare):
+    """Return the pegs of disks 1..num_disks after the first moves_done moves of tower_moves.
+
+    Disk d has moved (moves_done + 2^(d-1)) >> d times, always cycling the same way round
+    the pegs: towards target for disks of the same parity as the largest, away otherwise.
+    """
+    pegs = []
+    for disk in range(1, num_disks + 1):
+        cycle = (source, target, spare) if (num_disks - disk) % 2 == 0 else (source, spare, target)
+        pegs.append(cycle[((moves_done + (1 << (disk - 1))) >> disk) % 3])
+    return pegs
+
+def optimal_position(state, num_disks, moves_done, target=2):
+    """Return the packed state reached after the first moves_done moves of optimal_moves, in O(n)"""
+    code = _as_code(state)
+    for disk, from_peg, to_peg, spare in reversed(_misplaced_segments(code, num_disks, target)):
+        if moves_done <= 0:
+            break
+        # Moving the disk clears the segment's first move; the sub-tower on spare then follows
+        code ^= (from_peg ^ to_peg) << (2 * (disk - 1))
+        remaining = min(moves_done - 1, (1 << (disk - 1)) - 1)
+        for smaller, peg in enumerate(tower_position(disk - 1, remaining, spare, to_peg, from_peg), 1):
+            code = code & ~(PEG_MASK << (2 * (smaller - 1))) | peg << (2 * (smaller - 1))
+        moves_done -= 1 << (disk - 1)
+    return code
@@ -0,0 +1,127 @@
+import os
+import numpy as np
+from hanoi_game import encode_state, PEG_BITS, PEG_MASK
+
+UNSEEN = 0xFFFF
+# The farthest state of n disks is 2^n - 1 moves away, which must stay below UNSEEN in
+# uint16; 15 disks also keeps a table at 2 x 3^15 entries, about 57 MB
+MAX_DISKS = 15
+TABLE_DIR = os.environ.get("HANOI_TABLE_DIR", ".hanoi_cache")
+# (from_tower, to_tower) pairs in the order of hanoi_game.MOVE_ORDER
+PEG_PAIRS = [(0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)]
+_open_tables = {}
+
+def table_path(num_disks, directory=TABLE_DIR):
+    return os.path.join(directory, f"distances_{num_disks}.npy")
+
+def state_index(state, num_disks):
+    """Map a packed code or tuple-of-towers state to its base-3 index, disk 1 least significant"""
+    code = state if isinstance(state, int) else encode_state(state)
+    index = 0
+    for disk in range(num_disks, 0, -1):
+        index = index * 3 + ((code >> (PEG_BITS * (disk - 1))) & PEG_MASK)
+    return index
+
+def _digits(indices, num_disks):
+    """Return an (n_states, num_disks) array with the peg of every disk, disk 1 first"""
+    digits = np.empty((len(indices), num_disks), dtype=np.int8)
+    rest = indices.copy()
+    for disk in range(num_disks):
+        digits[:, disk] = rest % 3
+        rest //= 3
+    return digits
+
+def _predecessors(indices, num_disks, powers):
+    """Return every (state, neighbour, moved disk, from, to) of a layer as parallel arrays"""
+    digits = _digits(indices, num_disks)
+    tops = []
+    for peg in range(3):
+        on_peg = digits == peg
+        # argmax finds the first (smallest) disk on the peg; num_disks marks an empty peg
+        tops.append(np.where(on_peg.any(axis=1), on_peg.argmax(axis=1), num_disks))
+    parts = []
+    for from_tower, to_tower in PEG_PAIRS:
+        top = tops[from_tower]
+        legal = top < tops[to_tower]
+        disks = top[legal]
+        parts.append((indices[legal], indices[legal] + (to_tower - from_tower) * powers[disks],
+                      disks + 1, from_tower, to_tower))
+    return parts
+
+def _check_size(num_disks):
+    if num_disks > MAX_DISKS:
+        raise ValueError(f"distance tables go up to {MAX_DISKS} disks, not {num_disks}")
+
+class DistanceTable:
+    """Distance to the goal and the optimal next move for every 3-peg state of n disks.
+
+    Row 0 holds the distance and row 1 the next move packed as disk << 4 | from << 2 | to,
+    both indexed by state_index(). Tables are built by a layer-at-a-time NumPy BFS back
+    from the goal and stored as .npy files that later processes memory-map read-only.
+    """
+    def __init__(self, num_disks, data):
+        self.num_disks = num_disks
+        self.data = data
+        self.powers = [3 ** disk for disk in range(num_disks)]
+    
+    @classmethod
+    def build(cls, num_disks):
+        _check_size(num_disks)
+        size = 3 ** num_disks
+        powers = 3 ** np.arange(num_disks, dtype=np.int64)
+        data = np.full((2, size), UNSEEN, dtype=np.uint16)
+        goal = np.array([size - 1], dtype=np.int64)  # every disk on peg 2
+        data[:, goal] = 0
+        layer, distance = goal, 0
+        while len(layer):
+            distance += 1
+            next_layer = []
+            for states, neighbours, disks, from_tower, to_tower in _predecessors(layer, num_disks, powers):
+                new = data[0, neighbours] == UNSEEN
+                neighbours, states, disks = neighbours[new], states[new], disks[new]
+                data[0, neighbours] = distance
+                # The neighbour reaches this layer by undoing the move: to_tower back to from_tower
+                data[1, neighbours] = (disks << 4) | (to_tower << 2) | from_tower
+                next_layer.append(neighbours)
+            layer = np.unique(np.concatenate(next_layer))
+        return cls(num_disks, data)
+    
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp.npy"
+        np.save(temp_path, self.data)
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, mmap_mode="r")
+        num_disks = round(np.log(data.shape[1]) / np.log(3))
+        return cls(num_disks, data)
+    
+    def distance(self, state):
+        return int(self.data[0, state_index(state, self.num_disks)])
+    
+    def moves(self, state):
+        """Yield the optimal moves from a state to the goal, one table lookup per move"""
+        index = state_index(state, self.num_disks)
+        goal = 3 ** self.num_disks - 1
+        moves = self.data[1]
+        while index != goal:
+            move = int(moves[index])
+            disk, from_tower, to_tower = move >> 4, (move >> 2) & 3, move & 3
+            yield from_tower, to_tower
+            index += (to_tower - from_tower) * self.powers[disk - 1]
+    
+    def solution(self, state):
+        return list(self.moves(state))
+
+def open_table(num_disks, directory=TABLE_DIR):
+    """Return the table for num_disks, memory-mapping a saved one or building and saving it first"""
+    _check_size(num_disks)
+    table = _open_tables.get((num_disks, directory))
+    if table is None:
+        path = table_path(num_disks, directory)
+        if not os.path.exists(path):
+            DistanceTable.build(num_disks).save(path)
+        table = _open_tables[(num_disks, directory)] = DistanceTable.load(path)
+    return table
@@ -0,0 +1,80 @@
+import numpy as np
+from hanoi_game import peg_bits, move_order
+
+def peg_arrays(codes, num_disks, num_pegs=3):
+    """Yield (disk, peg of that disk in every state) from the largest disk down"""
+    bits = np.uint64(peg_bits(num_pegs))
+    mask = np.uint64((1 << int(bits)) - 1)
+    for disk in range(num_disks, 0, -1):
+        yield disk, ((codes >> (bits * np.uint64(disk - 1))) & mask).astype(np.intp)
+
+def top_disk_arrays(codes, num_disks, num_pegs=3):
+    """Return a (num_pegs, len(codes)) array of the smallest disk on each peg, num_disks + 1 if empty"""
+    tops = np.full((num_pegs, len(codes)), num_disks + 1, dtype=np.int64)
+    states = np.arange(len(codes))
+    # Writing from the largest disk down leaves the smallest disk of each peg in place
+    for disk, pegs in peg_arrays(codes, num_disks, num_pegs):
+        tops[pegs, states] = disk
+    return tops
+
+def expand_codes(codes, num_disks, num_pegs=3):
+    """Return (parents, successors) for every legal move out of an array of packed states.
+
+    parents holds the index in codes each successor was generated from; the moves are
+    produced one peg pair at a time, in move_order(), for the whole array at once.
+    """
+    bits = peg_bits(num_pegs)
+    tops = top_disk_arrays(codes, num_disks, num_pegs)
+    parents, successors = [], []
+    for from_tower, to_tower in move_order(num_pegs):
+        movable = np.flatnonzero(tops[from_tower] < tops[to_tower])
+        shifts = (bits * (tops[from_tower, movable] - 1)).astype(np.uint64)
+        parents.append(movable)
+        successors.append(codes[movable] ^ (np.uint64(from_tower ^ to_tower) << shifts))
+    return np.concatenate(parents), np.concatenate(successors)
+
+def random_codes(count, num_disks, num_pegs=3, seed=None):
+    """Return count packed states drawn uniformly and independently from all legal states.
+
+    seed is anything np.random.default_rng() takes, including a Generator to continue drawing from.
+    """
+    rng = np.random.default_rng(seed)
+    bits = peg_bits(num_pegs)
+    codes = np.zeros(count, dtype=np.uint64)
+    for disk in range(num_disks):
+        codes |= rng.integers(0, num_pegs, count, dtype=np.uint64) << np.uint64(bits * disk)
+    return codes
+
+def canonical_codes(codes, num_disks, num_pegs=3):
+    """Vectorized canonical_code(): relabel the non-goal pegs in order of their largest disk"""
+    bits = peg_bits(num_pegs)
+    goal_peg = num_pegs - 1
+    states = np.arange(len(codes))
+    labels = np.full((len(codes), num_pegs), -1, dtype=np.int64)
+    labels[:, goal_peg] = goal_peg
+    next_label = np.zeros(len(codes), dtype=np.int64)
+    result = np.zeros(len(codes), dtype=np.uint64)
+    for disk, pegs in peg_arrays(codes, num_disks, num_pegs):
+        label = labels[states, pegs]
+        new = label < 0
+        label[new] = next_label[new]
+        labels[states[new], pegs[new]] = label[new]
+        next_label += new
+        result |= label.astype(np.uint64) << np.uint64(bits * (disk - 1))
+    return result
+
+def next_layer(layer, seen, num_disks, num_pegs=3, symmetry=False):
+    """Expand a sorted BFS layer into the sorted array of unseen successors and their parent codes.
+
+    seen lists sorted arrays of states already reached. Moves are reversible, so every
+    successor of layer d lies in layer d - 1, d or d + 1 and passing those two is enough.
+    """
+    parents, successors = expand_codes(layer, num_disks, num_pegs)
+    if symmetry:
+        successors = canonical_codes(successors, num_disks, num_pegs)
+    successors, first = np.unique(successors, return_index=True)
+    parents = layer[parents[first]]
+    fresh = np.ones(len(successors), dtype=bool)
+    for states in seen:
+        fresh &= ~np.isin(successors, states, assume_unique=True)
+    return successors[fresh], parents[fresh]
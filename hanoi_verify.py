@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import chain
+from multiprocessing import Pool
+from hanoi_game import decode_state, encode_state, move_order, move_top_disk, peg_masks
+from hanoi_solver import optimal_length, frame_stewart_length
+from hanoi_moves import MAGIC, MoveSequence
+from hanoi_batch import parse_state
+
+def proven_optimum(towers):
+    """Length of a shortest solution where one is proven: any 3-peg state, or a full tower on the first of 4 pegs"""
+    num_disks = sum(len(tower) for tower in towers)
+    if len(towers) == 3:
+        return optimal_length(encode_state(towers), num_disks)
+    if len(towers) == 4 and len(towers[0]) == num_disks:
+        # Frame-Stewart is optimal for four pegs (Bousch, 2014); open beyond that
+        return frame_stewart_length(num_disks, 4)
+    return None
+
+def move_indices(moves, num_pegs):
+    """Map (from, to) moves to their move_order() index, -1 for anything that is not a move"""
+    index = {move: i for i, move in enumerate(move_order(num_pegs))}
+    return (index.get(tuple(move), -1) for move in moves)
+
+def replay(towers, indices):
+    """Apply moves, given as move_order() indices, to a start state until the first illegal one.
+
+    Returns (peg_masks() after the last legal move, moves applied, error or None).
+    """
+    pegs = peg_masks(towers)
+    order = move_order(len(towers))
+    applied = 0
+    for index in indices:
+        if index < 0:
+            return pegs, applied, {"index": applied,
+                                   "reason": f"not a move between two different pegs 0-{len(pegs) - 1}"}
+        from_tower, to_tower = order[index]
+        if not move_top_disk(pegs, from_tower, to_tower):
+            source, target = pegs[from_tower], pegs[to_tower]
+            reason = f"peg {from_tower} is empty" if not source else \
+                f"disk {(source & -source).bit_length()} onto smaller disk {(target & -target).bit_length()} on peg {to_tower}"
+            return pegs, applied, {"index": applied, "move": order[index], "reason": reason}
+        applied += 1
+    return pegs, applied, None
+
+def verify(towers, indices, source=None, moves=None):
+    """Replay a solution and report whether it is legal, reaches the goal and how it compares to the optimum.
+
+    moves, the solution as given, if there is one, only serves to quote a move that is not a peg pair.
+    """
+    num_disks = sum(len(tower) for tower in towers)
+    start = time.perf_counter()
+    pegs, applied, error = replay(towers, indices)
+    optimum = proven_optimum(towers)
+    solved = error is None and pegs[-1] == (1 << num_disks) - 1
+    result = {"source": source, "disks": num_disks, "pegs": len(towers), "valid": error is None,
+              "solved": solved, "length": applied if error is None else None,
+              "optimal_length": optimum, "excess": applied - optimum if solved and optimum is not None else None,
+              "replay_time": time.perf_counter() - start}
+    if error is not None:
+        if "move" not in error and moves is not None:
+            error["move"] = moves[error["index"]]
+        result["error"] = error
+    return result
+
+def solutions(path):
+    """Yield (towers, move indices, source, moves) for a packed .hmv file or each line of a JSON-lines file.
+
+    A JSON line holds "moves" and a start state in "towers", in any form parse_state
+    accepts, or "state" in the plain text form.
+    """
+    with open(path, "rb") as file:
+        packed = file.read(len(MAGIC)) == MAGIC
+    if packed:
+        with MoveSequence(path) as sequence:
+            towers = decode_state(sequence.start_state, sequence.num_disks, sequence.num_pegs)
+            # Decoded a chunk at a time with NumPy; only the replay itself runs per move
+            yield towers, chain.from_iterable(chunk.tolist() for chunk in sequence.index_chunks()), path, None
+        return
+    with open(path) as lines:
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            data = json.loads(line)
+            start = data["state"] if "state" in data else json.dumps({"towers": data["towers"]})
+            towers = parse_state(start)[1]
+            yield towers, move_indices(data["moves"], len(towers)), f"{path}:{number}", data["moves"]
+
+def verify_file(path):
+    try:
+        return [verify(*solution) for solution in solutions(path)]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return [{"source": path, "valid": False, "solved": False, "error": {"reason": str(e)}}]
+
+def verify_files(paths, workers=1):
+    """Yield one result per solution across the files, in order, with the files spread over a process pool"""
+    if workers == 1:
+        for path in paths:
+            yield from verify_file(path)
+        return
+    with Pool(workers) as pool:
+        for results in pool.imap(verify_file, paths):
+            yield from results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay solutions and check they are legal, solved and optimal")
+    parser.add_argument("paths", nargs="+", metavar="FILE", help=".hmv files or JSON lines with towers and moves")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, 0 for one per core")
+    parser.add_argument("--output", metavar="FILE", help="write one JSON result per solution to FILE instead of stdout")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    out = sys.stdout if args.output is None else open(args.output, "w")
+    summary = {"solutions": 0, "invalid": 0, "unsolved": 0, "suboptimal": 0, "moves": 0, "wall_time": 0.0}
+    start = time.perf_counter()
+    with out:
+        for result in verify_files(args.paths, args.workers or os.cpu_count()):
+            summary["solutions"] += 1
+            summary["invalid"] += not result["valid"]
+            summary["unsolved"] += result["valid"] and not result["solved"]
+            summary["suboptimal"] += bool(result.get("excess"))
+            summary["moves"] += result.get("length") or 0
+            out.write(json.dumps(result) + "\n")
+    summary["wall_time"] = time.perf_counter() - start
+    summary["moves_per_sec"] = summary["moves"] / summary["wall_time"] if summary["wall_time"] else 0.0
+    print(json.dumps(summary), file=sys.stderr)
+    sys.exit(1 if summary["invalid"] or summary["unsolved"] else 0)
+
+if __name__ == "__main__":
+    main()
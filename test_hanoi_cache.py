@@ -0,0 +1,78 @@
+from hanoi_game import TowerOfHanoi, encode_state
+from hanoi_search import EnhancedHanoiSearch
+from hanoi_cache import SolutionCache
+
+def solution(towers, algorithm="bfs"):
+    game = TowerOfHanoi(sum(len(tower) for tower in towers), len(towers))
+    game.set_state(towers)
+    return getattr(EnhancedHanoiSearch(game, symmetry=False), algorithm)()
+
+def solves(towers, moves):
+    game = TowerOfHanoi(sum(len(tower) for tower in towers), len(towers))
+    game.set_state(towers)
+    return all(game.move(from_tower, to_tower) for from_tower, to_tower in moves) and game.is_goal_state()
+
+def test_relabelled_hit():
+    towers = ((4, 1), (3,), (), (2,))
+    # The same state with the three non-goal pegs permuted
+    relabelled = ((), (4, 1), (3,), (2,))
+    cache = SolutionCache()
+    moves = solution(towers)
+    cache.put(encode_state(towers), 4, 4, "bfs", moves)
+    hit = cache.get(encode_state(relabelled), 4, 4, "bfs")
+    assert hit is not None and len(hit) == len(moves)
+    assert solves(relabelled, hit)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+def test_suffix_hit():
+    towers = ((5, 2), (4, 3), (1,))
+    cache = SolutionCache()
+    moves = solution(towers)
+    cache.put(encode_state(towers), 5, 3, "bfs", moves)
+    game = TowerOfHanoi(5, 3)
+    game.set_state(towers)
+    for from_tower, to_tower in moves[:4]:
+        game.move(from_tower, to_tower)
+    assert cache.get(game.get_encoded_state(), 5, 3, "bfs") == moves[4:]
+
+def test_no_suffix_hits_for_paths_that_are_not_shortest():
+    towers = ((5, 2), (4, 3), (1,))
+    cache = SolutionCache()
+    moves = solution(towers, "dfs")
+    cache.put(encode_state(towers), 5, 3, "dfs", moves)
+    game = TowerOfHanoi(5, 3)
+    game.set_state(towers)
+    game.move(*moves[0])
+    assert cache.get(game.get_encoded_state(), 5, 3, "dfs") is None
+
+def test_eviction_drops_least_recently_used_and_its_suffixes():
+    states = [((3, 2, 1), (), ()), ((3, 2), (1,), ()), ((3,), (2, 1), ())]
+    cache = SolutionCache(capacity=2)
+    paths = [solution(towers) for towers in states]
+    for towers, moves in zip(states, paths):
+        cache.put(encode_state(towers), 3, 3, "bfs", moves)
+    assert cache.get(encode_state(states[0]), 3, 3, "bfs") is None
+    assert cache.get(encode_state(states[1]), 3, 3, "bfs") == paths[1]
+    assert len(cache.entries) == 2
+    # Suffix keys never point at an evicted entry
+    assert all(entry_key in cache.entries for entry_key, _, _ in cache.suffixes.values())
+
+def test_database_survives_the_cache(tmp_path):
+    towers = ((4, 3), (), (2, 1))
+    moves = solution(towers)
+    SolutionCache(path=tmp_path / "solutions.db").put(encode_state(towers), 4, 3, "bfs", moves)
+    assert SolutionCache(path=tmp_path / "solutions.db").get(encode_state(towers), 4, 3, "bfs") == moves
+
+def test_suffixes_count_against_capacity():
+    cache = SolutionCache(capacity=40)
+    for towers in [((5, 4, 3, 2, 1), (), ()), ((5, 4, 3), (2, 1), ()), ((5,), (4, 3), (2, 1))]:
+        cache.put(encode_state(towers), 5, 3, "bfs", solution(towers))
+        cache.get(encode_state(((4, 3, 2, 1), (5,), ())), 5, 3, "bfs")
+        assert len(cache.entries) + len(cache.suffixes) <= 40
+
+def test_closed_form_paths_are_not_indexed():
+    towers = ((5, 2), (4, 3), (1,))
+    cache = SolutionCache()
+    cache.put(encode_state(towers), 5, 3, "optimal", solution(towers, "optimal"))
+    assert cache.get(encode_state(((5, 2), (4, 3, 1), ())), 5, 3, "optimal") is None
+    assert not cache.suffixes
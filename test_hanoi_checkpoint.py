@@ -0,0 +1,38 @@
+import time
+import pytest
+from hanoi_checkpoint import save_checkpoint, load_checkpoint
+from hanoi_game import TowerOfHanoi
+from hanoi_search import EnhancedHanoiSearch
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "search.ckpt"
+    big = (1 << 64) - 2
+    meta = {"algorithm": "bfs", "num_disks": 5, "heuristic": "Pattern database"}
+    sections = {"queue": [3, 1, big], "parents": {7: None, 3: 7, big: 3}, "empty": []}
+    save_checkpoint(path, meta, sections)
+    loaded_meta, loaded = load_checkpoint(path)
+    assert {key: loaded_meta[key] for key in meta} == meta
+    assert list(loaded["queue"]) == [3, 1, big]
+    assert loaded["parents"] == {7: None, 3: 7, big: 3}
+    assert list(loaded["empty"]) == []
+    assert not (tmp_path / "search.ckpt.tmp").exists()
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"HNMV" + bytes(16))
+    with pytest.raises(ValueError):
+        load_checkpoint(path)
+
+def test_resumed_search_keeps_heuristic(tmp_path):
+    path = tmp_path / "astar.ckpt"
+    game = TowerOfHanoi(6, 3)
+    game.set_state(((6, 5, 2), (4, 3, 1), ()))
+    search = EnhancedHanoiSearch(game, checkpoint_path=path)
+    search.use_heuristic("Largest disks")
+    search.save_checkpoint("astar", time.perf_counter(), heap=[game.get_encoded_state()], heap_f=[0],
+                           costs={game.get_encoded_state(): 0}, parents={game.get_encoded_state(): None})
+    resumed = EnhancedHanoiSearch.from_checkpoint(path)
+    assert resumed.heuristic_name == "Largest disks"
+    assert len(resumed.continue_search()) == len(EnhancedHanoiSearch(game).bfs())
+    with pytest.raises(ValueError):
+        EnhancedHanoiSearch.from_checkpoint(path, heuristic="Disks off goal")
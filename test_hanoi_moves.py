@@ -0,0 +1,47 @@
+import random
+import pytest
+from hanoi_game import move_order
+from hanoi_moves import MoveWriter, MoveSequence, save_moves
+
+@pytest.mark.parametrize("num_pegs", [3, 4, 5])
+@pytest.mark.parametrize("count", [0, 1, 7, 8, 9, 1000])
+def test_random_access(tmp_path, num_pegs, count):
+    rng = random.Random(count * num_pegs)
+    moves = [rng.choice(move_order(num_pegs)) for _ in range(count)]
+    path = save_moves(tmp_path / "moves.hmv", moves, 0b1001, 2, num_pegs)
+    with MoveSequence(path) as sequence:
+        assert (sequence.num_disks, sequence.num_pegs, sequence.start_state) == (2, num_pegs, 0b1001)
+        assert len(sequence) == count
+        assert list(sequence) == moves
+        for index in rng.sample(range(count), min(count, 50)):
+            assert sequence[index] == moves[index]
+            assert sequence[index - count] == moves[index]
+        for start in (0, 3, 8, 13):
+            assert sequence[start:start + 20] == moves[start:start + 20]
+            assert list(sequence.moves(start, start + 5)) == moves[start:start + 5]
+        assert sequence[1::3] == moves[1::3]
+        with pytest.raises(IndexError):
+            sequence[count]
+
+def test_writer_flushes_past_the_buffer(tmp_path):
+    moves = move_order(3) * 50000
+    with MoveWriter(tmp_path / "long.hmv", 0, 10) as writer:
+        writer.write_all(moves)
+    assert writer.count == len(moves)
+    with MoveSequence(tmp_path / "long.hmv") as sequence:
+        assert sequence[len(moves) - 1] == moves[-1]
+        assert list(sequence.moves(123457, 123470)) == moves[123457:123470]
+        indices = [int(index) for chunk in sequence.index_chunks(4096) for index in chunk]
+    assert [move_order(3)[index] for index in indices] == moves
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.hmv"
+    path.write_bytes(b"HNCK" + bytes(32))
+    with pytest.raises(ValueError):
+        MoveSequence(path)
+
+def test_rejects_start_states_off_the_pegs(tmp_path):
+    # Disk 2 on peg 3 of 3
+    path = save_moves(tmp_path / "corrupt.hmv", move_order(3)[:2], 0b1100, 2, 3)
+    with pytest.raises(ValueError):
+        MoveSequence(path)